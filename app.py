@@ -18,4 +18,10 @@ pages = {
 }
 
 pg = st.navigation(pages)
+# Pages register cleanups under "on_leave" for work that outlives their script runs
+for url_path, cleanup in list(st.session_state.get("on_leave", {}).items()):
+    if url_path != pg.url_path:
+        del st.session_state["on_leave"][url_path]
+        cleanup()
+st.session_state["current_page"] = pg.url_path
 pg.run()
@@ -0,0 +1,99 @@
+"""Compare rendering a wide, string-heavy result via pandas against keeping it in Arrow.
+
+Each strategy runs in a fresh process so peak memory is not skewed by earlier runs:
+
+    python -m benchmarks.arrow_rendering --rows 500000 --string-columns 20
+"""
+
+import argparse
+from decimal import Decimal
+
+import numpy as np
+import pyarrow as pa
+from streamlit.dataframe_util import convert_anything_to_arrow_bytes
+
+from benchmarks.memory import measure, run_isolated
+from utils.arrow_results import page, to_pandas
+
+
+def make_table(rows: int, string_columns: int, numeric_columns: int) -> pa.Table:
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"value-{i:06d}-" + "x" * 24 for i in range(10_000)])
+    columns = {}
+    for i in range(string_columns):
+        columns[f"s{i}"] = pa.array(vocabulary[rng.integers(0, len(vocabulary), rows)])
+    for i in range(numeric_columns):
+        columns[f"n{i}"] = pa.array(rng.random(rows))
+    columns["amount"] = pa.array(
+        [Decimal(v) / 100 for v in rng.integers(0, 10**8, rows).tolist()],
+        type=pa.decimal128(12, 2),
+    )
+    return pa.table(columns)
+
+
+def render_pandas_default(table, display_rows):
+    df = table.to_pandas()
+    return convert_anything_to_arrow_bytes(df)
+
+
+def render_pandas_self_destruct(table, display_rows):
+    df = to_pandas(table, exclusive=True)
+    return convert_anything_to_arrow_bytes(df)
+
+
+def render_pandas_arrow_backed(table, display_rows):
+    df = to_pandas(table, arrow_backed=True)
+    return convert_anything_to_arrow_bytes(df)
+
+
+def render_arrow(table, display_rows):
+    return convert_anything_to_arrow_bytes(table)
+
+
+def render_arrow_page(table, display_rows):
+    return convert_anything_to_arrow_bytes(page(table, 0, display_rows))
+
+
+STRATEGIES = {
+    "pandas (to_pandas)": render_pandas_default,
+    "pandas (split_blocks + self_destruct)": render_pandas_self_destruct,
+    "pandas (ArrowDtype)": render_pandas_arrow_backed,
+    "arrow (full table)": render_arrow,
+    "arrow (zero-copy page)": render_arrow_page,
+}
+
+
+def run_strategy(name, args):
+    table = make_table(args.rows, args.string_columns, args.numeric_columns)
+    # Read the size first: the self-destructing strategy frees the table's buffers
+    table_bytes = table.nbytes
+    measurement, _ = measure(STRATEGIES[name], table, args.display_rows)
+    return measurement, table_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--string-columns", type=int, default=20)
+    parser.add_argument("--numeric-columns", type=int, default=5)
+    parser.add_argument("--display-rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    results = {name: run_isolated(run_strategy, name, args) for name in STRATEGIES}
+
+    print(
+        f"{args.rows:,} rows, {args.string_columns} string + "
+        f"{args.numeric_columns + 1} numeric columns"
+    )
+    print(f"{'strategy':<40}{'seconds':>10}{'peak MB':>12}")
+    for name, (measurement, _) in results.items():
+        print(
+            f"{name:<40}{measurement.seconds:>10.3f}"
+            f"{measurement.peak_bytes / 1024**2:>12.1f}"
+        )
+    _, arrow_bytes = results[next(iter(STRATEGIES))]
+    print(f"Arrow result size: {arrow_bytes / 1024**2:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Local stand-in for the Files API, served over HTTP so a real `WorkspaceClient` can use it.
+
+    with FakeFilesAPI(FilesProfile(bytes_per_second=50 * 1024**2)) as api:
+        w = WorkspaceClient(host=api.url, token="local")
+
+Bandwidth is limited per connection, like a single TCP stream to cloud storage, so
+parallel requests add up. Bodies are hashed as they arrive and only kept, to be
+downloaded again, when `keep_contents` is set. With `fail_after_bytes`, storage goes down once it has
+received that many bytes in total: part uploads are cut off mid-body until
+`restore()` is called. Downloads honour `Range` headers unless `ranges` is off.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+FILES_PREFIX = "/api/2.0/fs/files"
+STORAGE_PREFIX = "/storage/"
+CHUNK_SIZE = 1024**2
+
+
+@dataclass
+class FilesProfile:
+    bytes_per_second: float | None = None
+    request_latency: float = 0.0
+    multipart: bool = True
+    keep_contents: bool = False
+    fail_after_bytes: int | None = None
+    ranges: bool = True
+
+
+@dataclass
+class FilesLog:
+    requests: list[tuple[str, str]] = field(default_factory=list)
+    bytes_received: int = 0
+    bytes_sent: int = 0
+
+
+@dataclass
+class StoredFile:
+    size: int
+    sha256: str | None
+    contents: bytes | None = None
+    last_modified: str = field(default_factory=lambda: formatdate(usegmt=True))
+
+
+@dataclass
+class _Body:
+    size: int
+    sha256: str
+    md5: str
+    contents: bytes | None
+
+
+class FakeFilesAPI:
+    def __init__(self, profile: FilesProfile | None = None):
+        self.profile = profile or FilesProfile()
+        self.log = FilesLog()
+        self.files: dict[str, StoredFile] = {}
+        self.sessions: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        handler = type("Handler", (_Handler,), {"api": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self) -> "FakeFilesAPI":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def restore(self):
+        """End an outage injected with `fail_after_bytes`."""
+        self.profile.fail_after_bytes = None
+
+    def store(self, path: str, parts: list[_Body]):
+        contents = None
+        if self.profile.keep_contents:
+            contents = b"".join(part.contents for part in parts)
+        sha256 = None
+        if contents is not None:
+            sha256 = hashlib.sha256(contents).hexdigest()
+        elif len(parts) == 1:
+            sha256 = parts[0].sha256
+        with self._lock:
+            self.files[path] = StoredFile(sum(p.size for p in parts), sha256, contents)
+
+
+class _Dropped(Exception):
+    """The injected outage cut off a request."""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    api: FakeFilesAPI
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionError:
+            # Clients drop kept-alive connections, e.g. after reading part of a download
+            pass
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def do_HEAD(self):
+        self._handle("HEAD")
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def _handle(self, method: str):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with self.api._lock:
+            self.api.log.requests.append((method, url.path))
+        if self.api.profile.request_latency:
+            time.sleep(self.api.profile.request_latency)
+        if url.path.startswith(FILES_PREFIX):
+            self._files(method, unquote(url.path[len(FILES_PREFIX) :]), query)
+        elif url.path.startswith(STORAGE_PREFIX):
+            self._storage(method, url.path[len(STORAGE_PREFIX) :].split("/"))
+        elif url.path == "/api/2.0/fs/create-upload-part-urls":
+            self._part_urls(self._json())
+        elif url.path == "/api/2.0/fs/create-abort-upload-url":
+            body = self._json()
+            self._reply(
+                200,
+                {
+                    "abort_upload_url": {
+                        "url": f"{self.api.url}{STORAGE_PREFIX}{body['session_token']}"
+                    }
+                },
+            )
+        else:
+            self._reply(404, {"error_code": "NOT_FOUND", "message": url.path})
+
+    def _files(self, method: str, path: str, query: dict):
+        api = self.api
+        if method == "HEAD":
+            stored = api.files.get(path)
+            if stored is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                return self.end_headers()
+            self.send_response(200)
+            self.send_header("Content-Length", str(stored.size))
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Last-Modified", stored.last_modified)
+            return self.end_headers()
+        if method == "GET":
+            stored = api.files.get(path)
+            if stored is None or stored.contents is None:
+                return self._reply(404, {"error_code": "NOT_FOUND", "message": path})
+            return self._download(stored)
+        if method == "PUT":
+            body = self._body()
+            if path in api.files and query.get("overwrite") != "true":
+                return self._reply(409, {"error_code": "ALREADY_EXISTS"})
+            api.store(path, [body])
+            return self._reply(204)
+        if method == "DELETE":
+            with api._lock:
+                api.files.pop(path, None)
+            return self._reply(204)
+        action = query.get("action")
+        if action == "initiate-upload":
+            self._json()
+            if not api.profile.multipart:
+                return self._reply(200, {})
+            token = uuid.uuid4().hex
+            with api._lock:
+                api.sessions[token] = {"path": path, "parts": {}}
+            return self._reply(200, {"multipart_upload": {"session_token": token}})
+        if action == "complete-upload":
+            body = self._json()
+            with api._lock:
+                session = api.sessions.pop(query["session_token"], None)
+            if session is None or session["path"] != path:
+                return self._reply(400, {"error_code": "INVALID_PARAMETER_VALUE"})
+            parts = []
+            for expected, part in enumerate(body["parts"], start=1):
+                stored = session["parts"].get(part["part_number"])
+                if part["part_number"] != expected or stored is None:
+                    return self._reply(400, {"message": f"Missing part {expected}"})
+                if f'"{stored.md5}"' != part["etag"]:
+                    return self._reply(
+                        400, {"message": f"Bad ETag for part {expected}"}
+                    )
+                parts.append(stored)
+            api.store(path, parts)
+            return self._reply(200, {})
+        self._reply(400, {"error_code": "INVALID_PARAMETER_VALUE", "message": action})
+
+    def _download(self, stored: StoredFile):
+        start, end = 0, stored.size - 1
+        requested = self.headers.get("Range", "")
+        if self.api.profile.ranges and requested.startswith("bytes="):
+            first, _, last = requested[len("bytes=") :].partition("-")
+            start = int(first)
+            end = min(int(last), stored.size - 1) if last else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{stored.size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Last-Modified", stored.last_modified)
+        self.end_headers()
+        try:
+            for offset in range(start, end + 1, CHUNK_SIZE):
+                chunk = stored.contents[offset : min(offset + CHUNK_SIZE, end + 1)]
+                self.wfile.write(chunk)
+                with self.api._lock:
+                    self.api.log.bytes_sent += len(chunk)
+        except ConnectionError:
+            # The client had read what it wanted and hung up
+            self.close_connection = True
+
+    def _part_urls(self, body: dict):
+        start, count = body["start_part_number"], body["count"]
+        token = body["session_token"]
+        with self.api._lock:
+            known = token in self.api.sessions
+        if not known:
+            return self._reply(
+                404, {"error_code": "NOT_FOUND", "message": "Upload session not found"}
+            )
+        urls = [
+            {
+                "part_number": number,
+                "url": f"{self.api.url}{STORAGE_PREFIX}{token}/{number}",
+                "headers": [
+                    {"name": "Content-Type", "value": "application/octet-stream"}
+                ],
+            }
+            for number in range(start, start + count)
+        ]
+        self._reply(200, {"upload_part_urls": urls})
+
+    def _storage(self, method: str, segments: list[str]):
+        api = self.api
+        if method == "DELETE":
+            with api._lock:
+                api.sessions.pop(segments[0], None)
+            return self._reply(204)
+        try:
+            body = self._body(faulty=True)
+        except _Dropped:
+            # Hang up without a response, like a connection reset
+            self.close_connection = True
+            return
+        with api._lock:
+            session = api.sessions.get(segments[0])
+            if session is not None:
+                session["parts"][int(segments[1])] = body
+        if session is None:
+            return self._reply(404, {"message": "No such upload"})
+        self._reply(200, headers={"ETag": f'"{body.md5}"'})
+
+    def _body(self, faulty: bool = False) -> _Body:
+        remaining = int(self.headers.get("Content-Length") or 0)
+        sha256, md5 = hashlib.sha256(), hashlib.md5()
+        chunks = [] if self.api.profile.keep_contents else None
+        size = 0
+        bytes_per_second = self.api.profile.bytes_per_second
+        while remaining:
+            started = time.perf_counter()
+            chunk = self.rfile.read(min(remaining, CHUNK_SIZE))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            size += len(chunk)
+            if self._receive(len(chunk)) and faulty:
+                raise _Dropped()
+            sha256.update(chunk)
+            md5.update(chunk)
+            if chunks is not None:
+                chunks.append(chunk)
+            if bytes_per_second:
+                delay = len(chunk) / bytes_per_second - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+        contents = b"".join(chunks) if chunks is not None else None
+        return _Body(size, sha256.hexdigest(), md5.hexdigest(), contents)
+
+    def _receive(self, count: int) -> bool:
+        """Log `count` more bytes received and tell whether an outage has started."""
+        with self.api._lock:
+            self.api.log.bytes_received += count
+            limit = self.api.profile.fail_after_bytes
+            return limit is not None and self.api.log.bytes_received > limit
+
+    def _json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _reply(
+        self, status: int, body: dict | None = None, headers: dict | None = None
+    ):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if payload:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
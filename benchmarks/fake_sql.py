@@ -0,0 +1,221 @@
+"""Local stand-in for `databricks.sql` connections that serves synthetic Arrow data.
+
+Results are generated batch by batch, so a 10M-row table costs no more memory than the
+consumer keeps. Latency can be injected per statement, per fetch round trip and per
+transferred byte to approximate a remote warehouse.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+import numpy as np
+import pyarrow as pa
+from databricks.sql.thrift_api.TCLIService import ttypes
+
+
+@dataclass
+class WarehouseProfile:
+    rows: int = 100_000
+    int_columns: int = 2
+    float_columns: int = 2
+    string_columns: int = 4
+    string_length: int = 16
+    query_latency: float = 0.0
+    fetch_latency: float = 0.0
+    bytes_per_second: float | None = None
+    table_version: int = 1
+
+
+@dataclass
+class WarehouseLog:
+    statements: list[tuple[str, object]] = field(default_factory=list)
+    bytes_sent: int = 0
+    bytes_fetched: int = 0
+    bytes_uploaded: int = 0
+    cancelled: int = 0
+
+    def record(self, operation: str, parameters):
+        self.statements.append((operation, parameters))
+        self.bytes_sent += len(operation.encode()) + len(repr(parameters or ""))
+
+
+class FakeWarehouse:
+    """Factory for fake connections sharing one profile and statement log."""
+
+    def __init__(self, profile: WarehouseProfile | None = None):
+        self.profile = profile or WarehouseProfile()
+        self.log = WarehouseLog()
+        self.files = FakeFiles(self)
+        self._lock = threading.Lock()
+        vocabulary = np.array(
+            [f"{i:08d}".ljust(self.profile.string_length, "x") for i in range(4096)]
+        )
+        self._vocabulary = pa.array(vocabulary)
+
+    def connect(self, **kwargs) -> "FakeConnection":
+        return FakeConnection(self)
+
+    def batch(self, offset: int, length: int) -> pa.Table:
+        p = self.profile
+        ids = np.arange(offset, offset + length, dtype=np.int64)
+        columns = {}
+        for i in range(p.int_columns):
+            columns[f"i{i}"] = pa.array(ids * (i + 1))
+        for i in range(p.float_columns):
+            columns[f"f{i}"] = pa.array(ids * 0.5 + i)
+        for i in range(p.string_columns):
+            columns[f"s{i}"] = self._vocabulary.take(pa.array((ids + i) % 4096))
+        return pa.table(columns)
+
+    def schema(self) -> pa.Schema:
+        return self.batch(0, 0).schema
+
+
+class FakeFiles:
+    """Stand-in for `WorkspaceClient().files` that reads and counts uploads."""
+
+    def __init__(self, warehouse: FakeWarehouse):
+        self.warehouse = warehouse
+
+    def upload(self, file_path: str, contents, *, overwrite: bool | None = None):
+        size = 0
+        while chunk := contents.read(1024**2):
+            size += len(chunk)
+        profile = self.warehouse.profile
+        if profile.bytes_per_second:
+            time.sleep(size / profile.bytes_per_second)
+        with self.warehouse._lock:
+            self.warehouse.log.bytes_uploaded += size
+
+    def delete(self, file_path: str):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, warehouse: FakeWarehouse):
+        self.warehouse = warehouse
+        self.open = True
+
+    def cursor(self, arraysize: int = 100_000, **kwargs) -> "FakeCursor":
+        if not self.open:
+            raise RuntimeError("Cannot create cursor from closed connection")
+        return FakeCursor(self, arraysize)
+
+    def close(self):
+        self.open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeCursor:
+    def __init__(self, connection: FakeConnection, arraysize: int):
+        self.connection = connection
+        self.warehouse = connection.warehouse
+        self.arraysize = arraysize
+        self._rows = 0
+        self._position = 0
+        self._table: pa.Table | None = None
+        self._ready_at = 0.0
+        self._cancelled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, operation: str, parameters=None) -> "FakeCursor":
+        self._start(operation, parameters)
+        time.sleep(max(0.0, self._ready_at - time.monotonic()))
+        return self
+
+    def execute_async(self, operation: str, parameters=None) -> "FakeCursor":
+        self._start(operation, parameters)
+        return self
+
+    def get_query_state(self):
+        if self._cancelled:
+            return ttypes.TOperationState.CANCELED_STATE
+        if time.monotonic() < self._ready_at:
+            return ttypes.TOperationState.RUNNING_STATE
+        return ttypes.TOperationState.FINISHED_STATE
+
+    def get_async_execution_result(self) -> "FakeCursor":
+        time.sleep(max(0.0, self._ready_at - time.monotonic()))
+        return self
+
+    def cancel(self):
+        self._cancelled = True
+        self.warehouse.log.cancelled += 1
+
+    def fetchmany_arrow(self, size: int) -> pa.Table:
+        if self._table is not None:
+            batch = self._table.slice(self._position, size)
+        else:
+            length = max(0, min(size, self._rows - self._position))
+            batch = self.warehouse.batch(self._position, length)
+            self._transfer(batch)
+        self._position += batch.num_rows
+        return batch
+
+    def fetchall_arrow(self) -> pa.Table:
+        batches = []
+        while True:
+            batch = self.fetchmany_arrow(self.arraysize)
+            if batch.num_rows:
+                batches.append(batch)
+            if batch.num_rows < self.arraysize:
+                break
+        if not batches:
+            return self.fetchmany_arrow(0)
+        return pa.concat_tables(batches)
+
+    def fetchall(self):
+        table = self.fetchall_arrow()
+        Row = namedtuple("Row", table.column_names, rename=True)
+        return [Row(**row) for row in table.to_pylist()]
+
+    def fetchone(self):
+        rows = self.fetchall()
+        return rows[0] if rows else None
+
+    def close(self):
+        self._table = None
+
+    def _start(self, operation: str, parameters):
+        profile = self.warehouse.profile
+        self.warehouse.log.record(operation, parameters)
+        self._position = 0
+        self._rows = 0
+        self._table = None
+        self._cancelled = False
+        self._ready_at = time.monotonic() + profile.query_latency
+
+        statement = operation.lstrip().upper()
+        if statement.startswith("DESCRIBE HISTORY"):
+            self._table = pa.table({"version": [profile.table_version]})
+        elif statement.startswith("SELECT 1"):
+            self._table = pa.table({"1": [1]})
+        elif statement.startswith("SELECT"):
+            self._rows = profile.rows
+            if "LIMIT 0" in statement:
+                self._rows = 0
+        else:
+            # Writes return no rows
+            self._table = pa.table({})
+
+    def _transfer(self, batch: pa.Table):
+        profile = self.warehouse.profile
+        delay = profile.fetch_latency
+        if profile.bytes_per_second:
+            delay += batch.nbytes / profile.bytes_per_second
+        if delay:
+            time.sleep(delay)
+        with self.warehouse._lock:
+            self.warehouse.log.bytes_fetched += batch.nbytes
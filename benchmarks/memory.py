@@ -0,0 +1,51 @@
+"""Wall time and peak resident memory of a callable, sampled from /proc on Linux."""
+
+import multiprocessing
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+@dataclass
+class Measurement:
+    seconds: float
+    peak_bytes: int
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE
+
+
+def measure(fn, *args, interval: float = 0.002, **kwargs) -> tuple[Measurement, object]:
+    """Run `fn` and return how long it took and how far RSS rose above its starting point."""
+    baseline = current_rss()
+    peak = baseline
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, current_rss())
+            time.sleep(interval)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - started
+        done.set()
+        sampler.join()
+    peak = max(peak, current_rss())
+    return Measurement(seconds, peak - baseline), result
+
+
+def run_isolated(target, *args):
+    """Call `target(*args)` in a fresh process so its peak memory is not skewed by earlier runs."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(target, args)
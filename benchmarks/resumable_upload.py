@@ -0,0 +1,116 @@
+"""Benchmark resuming an interrupted multipart upload against starting it over.
+
+Storage goes down partway through the first attempt, then comes back for a retry.
+In the `expired` case the saved session is gone by then, so the retry starts over:
+
+    python -m benchmarks.resumable_upload --mb 128 --part-mb 8 --fail-at 0.6
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from databricks.sdk import WorkspaceClient
+
+from benchmarks.fake_files_api import FakeFilesAPI, FilesProfile
+from benchmarks.volume_upload import VOLUME_PATH, make_file
+from utils.multipart_upload import FilesMultipartAPI, MultipartUploader
+from utils.upload_checkpoints import CheckpointStore
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024**2):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def run_case(case: str, path: str, args) -> dict:
+    size = os.path.getsize(path)
+    profile = FilesProfile(
+        bytes_per_second=args.mbps * 1024**2 if args.mbps else None,
+        request_latency=args.latency,
+        keep_contents=True,
+        fail_after_bytes=int(size * args.fail_at),
+    )
+    target = f"{VOLUME_PATH}/{case}.bin"
+    with tempfile.TemporaryDirectory() as directory, FakeFilesAPI(profile) as api:
+        w = WorkspaceClient(host=api.url, token="local")
+        uploader = MultipartUploader(
+            FilesMultipartAPI(w, connections=args.concurrency),
+            w.files.upload,
+            part_size=args.part_mb * 1024**2,
+            concurrency=args.concurrency,
+            max_attempts=2,
+            backoff=0.05,
+            checkpoints=CheckpointStore(directory) if case != "restart" else None,
+        )
+        with open(path, "rb") as f:
+            try:
+                uploader.upload(target, f)
+            except Exception as e:
+                interrupted = type(e).__name__
+            else:
+                raise RuntimeError("The injected outage did not interrupt the upload")
+            first = api.log.bytes_received
+            api.restore()
+            if case == "expired":
+                # Storage discarded the unfinished session before the retry
+                api.sessions.clear()
+            f.seek(0)
+            started = time.perf_counter()
+            uploader.upload(target, f)
+            seconds = time.perf_counter() - started
+        stored = api.files[target]
+    return {
+        "case": case,
+        "interrupted": interrupted,
+        "first_mb": first / 1024**2,
+        "retry_mb": (api.log.bytes_received - first) / 1024**2,
+        "retry_seconds": seconds,
+        "intact": stored.sha256 == file_sha256(path),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=128)
+    parser.add_argument("--part-mb", type=int, default=8)
+    parser.add_argument(
+        "--mbps", type=float, default=40, help="Bandwidth per connection in MB/s"
+    )
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--fail-at",
+        type=float,
+        default=0.6,
+        help="Fraction of the file sent before the outage",
+    )
+    args = parser.parse_args()
+
+    path = make_file(int(args.mb * 1024**2))
+    try:
+        results = [
+            run_case(case, path, args) for case in ("restart", "resume", "expired")
+        ]
+    finally:
+        os.remove(path)
+
+    print(f"{args.mb:,.0f} MB file, outage after {args.fail_at:.0%} of it")
+    print(
+        f"{'case':<10}{'interrupted by':<18}{'1st MB':>9}{'retry MB':>10}"
+        f"{'retry s':>9}{'intact':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['case']:<10}{r['interrupted']:<18}{r['first_mb']:>9.1f}"
+            f"{r['retry_mb']:>10.1f}{r['retry_seconds']:>9.2f}{str(r['intact']):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Benchmark the table recipes' read and write paths against a local fake warehouse.
+
+No workspace or network is needed. Every case runs in a fresh process:
+
+    python -m benchmarks.table_recipes --rows 1000 100000 1000000 10000000
+    python -m benchmarks.table_recipes --json results.json
+    python -m benchmarks.table_recipes --compare results.json  # exits 1 on regressions
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.fake_sql import FakeWarehouse, WarehouseProfile
+from benchmarks.memory import measure, run_isolated
+from utils.arrow_results import to_pandas
+from utils.async_query import AsyncQuery
+from utils.table_stream import TableStream
+from utils.table_writer import overwrite_from_volume, overwrite_in_batches
+
+TABLE_NAME = "main.bench.table"
+STAGING_PATH = "/Volumes/main/bench/staging"
+STATEMENT = f"SELECT * FROM {TABLE_NAME}"
+PAGE_SIZE = 10_000
+
+# Differences below these are noise, whatever the relative change
+MIN_SECONDS_DELTA = 0.05
+MIN_PEAK_MB_DELTA = 5
+
+
+def wait(query: AsyncQuery):
+    while query.is_pending():
+        time.sleep(0.005)
+
+
+def read_full(warehouse: FakeWarehouse) -> dict:
+    started = time.perf_counter()
+    query = AsyncQuery.submit(warehouse.connect(), STATEMENT)
+    wait(query)
+    df = to_pandas(query.fetch_arrow(), exclusive=True)
+    query.close()
+    return {"first_row_seconds": time.perf_counter() - started, "rows": len(df)}
+
+
+def read_arrow(warehouse: FakeWarehouse) -> dict:
+    started = time.perf_counter()
+    query = AsyncQuery.submit(warehouse.connect(), STATEMENT)
+    wait(query)
+    table = query.fetch_arrow()
+    query.close()
+    return {"first_row_seconds": time.perf_counter() - started, "rows": table.num_rows}
+
+
+def read_streaming(warehouse: FakeWarehouse) -> dict:
+    started = time.perf_counter()
+    query = AsyncQuery.submit(warehouse.connect(), STATEMENT, arraysize=PAGE_SIZE)
+    wait(query)
+    query.finish()
+    stream = TableStream(
+        query.cursor,
+        page_size=PAGE_SIZE,
+        max_bytes=64 * 1024**2,
+        on_close=query.close,
+    )
+    stream.page(0)
+    first_row_seconds = time.perf_counter() - started
+    number = 1
+    while stream.page(number) is not None:
+        number += 1
+    rows = stream.rows_fetched
+    stream.close()
+    return {"first_row_seconds": first_row_seconds, "rows": rows}
+
+
+def write_insert_overwrite(warehouse: FakeWarehouse, df) -> dict:
+    # The original recipe: one statement with every value inlined through repr()
+    rows = list(df.itertuples(index=False))
+    values = ",".join([f"({','.join(map(repr, row))})" for row in rows])
+    conn = warehouse.connect()
+    with conn.cursor() as cursor:
+        cursor.execute(f"INSERT OVERWRITE {TABLE_NAME} VALUES {values}")
+    return {"rows": len(df)}
+
+
+def write_batched(warehouse: FakeWarehouse, df) -> dict:
+    overwrite_in_batches(TABLE_NAME, df, warehouse.connect())
+    return {"rows": len(df)}
+
+
+def write_bulk(warehouse: FakeWarehouse, df) -> dict:
+    overwrite_from_volume(
+        TABLE_NAME, df, warehouse.connect(), warehouse.files, STAGING_PATH
+    )
+    return {"rows": len(df)}
+
+
+READ_CASES = {
+    "read_full": read_full,
+    "read_arrow": read_arrow,
+    "read_streaming": read_streaming,
+}
+WRITE_CASES = {
+    "write_insert_overwrite": write_insert_overwrite,
+    "write_batched": write_batched,
+    "write_bulk": write_bulk,
+}
+CASES = [*READ_CASES, *WRITE_CASES]
+
+
+def run_case(case: str, rows: int, profile: WarehouseProfile) -> dict:
+    profile.rows = rows
+    warehouse = FakeWarehouse(profile)
+    if case in READ_CASES:
+        measurement, result = measure(READ_CASES[case], warehouse)
+    else:
+        df = warehouse.batch(0, rows).to_pandas()
+        measurement, result = measure(WRITE_CASES[case], warehouse, df)
+    return {
+        "case": case,
+        "rows": rows,
+        "seconds": measurement.seconds,
+        "first_row_seconds": result.get("first_row_seconds"),
+        "rows_per_second": rows / measurement.seconds if measurement.seconds else None,
+        "peak_mb": measurement.peak_bytes / 1024**2,
+        "statements": len(warehouse.log.statements),
+        "statement_bytes": warehouse.log.bytes_sent,
+        "uploaded_bytes": warehouse.log.bytes_uploaded,
+    }
+
+
+def find_regressions(results: list[dict], baseline: list[dict], tolerance: float):
+    previous = {(r["case"], r["rows"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["case"], result["rows"]))
+        if before is None:
+            continue
+        for metric, min_delta in (
+            ("seconds", MIN_SECONDS_DELTA),
+            ("peak_mb", MIN_PEAK_MB_DELTA),
+            ("statement_bytes", 0),
+        ):
+            old, new = before[metric], result[metric]
+            if new - old > min_delta and new > old * (1 + tolerance):
+                regressions.append(
+                    f"{result['case']} @ {result['rows']:,} rows: "
+                    f"{metric} {old:,.3f} -> {new:,.3f}"
+                )
+    return regressions
+
+
+def print_results(results: list[dict]):
+    print(
+        f"{'case':<24}{'rows':>12}{'seconds':>10}{'first row s':>13}"
+        f"{'rows/s':>14}{'peak MB':>10}{'stmts':>7}{'sent MB':>10}{'upload MB':>11}"
+    )
+    for r in results:
+        first_row = (
+            f"{r['first_row_seconds']:.3f}"
+            if r["first_row_seconds"] is not None
+            else "-"
+        )
+        print(
+            f"{r['case']:<24}{r['rows']:>12,}{r['seconds']:>10.3f}{first_row:>13}"
+            f"{r['rows_per_second'] or 0:>14,.0f}{r['peak_mb']:>10.1f}"
+            f"{r['statements']:>7}{r['statement_bytes'] / 1024**2:>10.2f}"
+            f"{r.get('uploaded_bytes', 0) / 1024**2:>11.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--string-columns", type=int, default=4)
+    parser.add_argument("--query-latency", type=float, default=0.0)
+    parser.add_argument("--fetch-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--mbps", type=float, help="Simulated transfer bandwidth in MB/s"
+    )
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    profile = WarehouseProfile(
+        string_columns=args.string_columns,
+        query_latency=args.query_latency,
+        fetch_latency=args.fetch_latency,
+        bytes_per_second=args.mbps * 1024**2 if args.mbps else None,
+    )
+    results = [
+        run_isolated(run_case, case, rows, profile)
+        for rows in args.rows
+        for case in args.cases
+    ]
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
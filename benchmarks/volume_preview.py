@@ -0,0 +1,99 @@
+"""Benchmark how much of a Volume file a preview transfers, against its full size.
+
+The preview cost should stay flat however many rows or row groups the file has:
+
+    python -m benchmarks.volume_preview --rows 20000000 --columns 12
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as csv
+import pyarrow.parquet as pq
+from databricks.sdk import WorkspaceClient
+
+from benchmarks.fake_files_api import FakeFilesAPI, FilesProfile, StoredFile
+from benchmarks.volume_upload import VOLUME_PATH
+from utils.volume_preview import preview_file
+
+
+def make_table(rows: int, columns: int) -> pa.Table:
+    rng = np.random.default_rng(0)
+    data = {"id": np.arange(rows)}
+    for i in range(1, columns):
+        data[f"c{i}"] = (
+            rng.random(rows) if i % 2 else rng.integers(0, 1_000_000, rows).astype(str)
+        )
+    return pa.table(data)
+
+
+def encode(table: pa.Table, format: str, row_group_rows: int) -> bytes:
+    buffer = io.BytesIO()
+    if format == "parquet":
+        pq.write_table(table, buffer, row_group_size=row_group_rows)
+    else:
+        csv.write_csv(table, buffer)
+    return buffer.getvalue()
+
+
+def run_case(api: FakeFilesAPI, w, name: str, contents: bytes, ranges: bool) -> dict:
+    path = f"{VOLUME_PATH}/{name}"
+    api.files[path] = StoredFile(len(contents), None, contents)
+    api.profile.ranges = ranges
+    sent = api.log.bytes_sent
+    started = time.perf_counter()
+    try:
+        preview = preview_file(w, path)
+        outcome = f"{len(preview.data)} rows x {len(preview.data.columns)}"
+        requests = preview.requests
+    except ValueError:
+        outcome, requests = "refused", 0
+    if ranges and api.log.bytes_sent - sent >= len(contents):
+        raise RuntimeError(f"Previewing {name} transferred the whole file or more")
+    return {
+        "case": f"{name}{'' if ranges else ' (no ranges)'}",
+        "file_mb": len(contents) / 1024**2,
+        "sent_kb": (api.log.bytes_sent - sent) / 1024,
+        "requests": requests,
+        "seconds": time.perf_counter() - started,
+        "outcome": outcome,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--row-group-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    table = make_table(args.rows, args.columns)
+    parquet = encode(table, "parquet", args.row_group_rows)
+    text = encode(table, "csv", args.row_group_rows)
+    del table
+
+    with FakeFilesAPI(FilesProfile(keep_contents=True)) as api:
+        w = WorkspaceClient(host=api.url, token="local")
+        results = [
+            run_case(api, w, "data.parquet", parquet, ranges=True),
+            run_case(api, w, "data.csv", text, ranges=True),
+            run_case(api, w, "data.parquet", parquet, ranges=False),
+        ]
+
+    print(f"{args.rows:,} rows, {args.columns} columns")
+    print(
+        f"{'case':<26}{'file MB':>9}{'sent KB':>10}{'requests':>10}"
+        f"{'seconds':>9}  outcome"
+    )
+    for r in results:
+        print(
+            f"{r['case']:<26}{r['file_mb']:>9.1f}{r['sent_kb']:>10.1f}"
+            f"{r['requests']:>10}{r['seconds']:>9.2f}  {r['outcome']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark single-stream and parallel multipart uploads against a local Files API.
+
+Bandwidth is limited per connection, as with one TCP stream to cloud storage:
+
+    python -m benchmarks.volume_upload --mb 512 --mbps 40 --concurrency 1 4 8 16
+"""
+
+import argparse
+import os
+import tempfile
+
+from databricks.sdk import WorkspaceClient
+
+from benchmarks.fake_files_api import FakeFilesAPI, FilesProfile
+from benchmarks.memory import measure, run_isolated
+from utils.file_streams import ProgressReader
+from utils.multipart_upload import FilesMultipartAPI, MultipartUploader
+
+VOLUME_PATH = "/Volumes/main/bench/uploads"
+
+
+def make_file(size: int) -> str:
+    handle, path = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(handle, "wb") as f:
+        for offset in range(0, size, 16 * 1024**2):
+            f.write(os.urandom(min(16 * 1024**2, size - offset)))
+    return path
+
+
+def upload_single(w, path: str, args) -> int:
+    with open(path, "rb") as f:
+        w.files.upload(f"{VOLUME_PATH}/single.bin", ProgressReader(f), overwrite=True)
+    return 1
+
+
+def upload_multipart(w, path: str, args, concurrency: int) -> int:
+    uploader = MultipartUploader(
+        FilesMultipartAPI(w, connections=concurrency),
+        w.files.upload,
+        part_size=args.part_mb * 1024**2,
+        concurrency=concurrency,
+    )
+    with open(path, "rb") as f:
+        return uploader.upload(f"{VOLUME_PATH}/multipart.bin", f)
+
+
+def run_case(case: str, concurrency: int, args) -> dict:
+    size = int(args.mb * 1024**2)
+    path = make_file(size)
+    profile = FilesProfile(
+        bytes_per_second=args.mbps * 1024**2 if args.mbps else None,
+        request_latency=args.latency,
+    )
+    try:
+        with FakeFilesAPI(profile) as api:
+            w = WorkspaceClient(host=api.url, token="local")
+            if case == "single":
+                measurement, parts = measure(upload_single, w, path, args)
+            else:
+                measurement, parts = measure(
+                    upload_multipart, w, path, args, concurrency
+                )
+            received = api.log.bytes_received
+    finally:
+        os.remove(path)
+    return {
+        "case": case if case == "single" else f"multipart x{concurrency}",
+        "seconds": measurement.seconds,
+        "mb_per_second": args.mb / measurement.seconds,
+        "peak_mb": measurement.peak_bytes / 1024**2,
+        "parts": parts,
+        "received_mb": received / 1024**2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=256)
+    parser.add_argument("--part-mb", type=int, default=16)
+    parser.add_argument(
+        "--mbps", type=float, default=40, help="Bandwidth per connection in MB/s"
+    )
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    results = [run_isolated(run_case, "single", 1, args)] + [
+        run_isolated(run_case, "multipart", concurrency, args)
+        for concurrency in args.concurrency
+    ]
+
+    print(f"{args.mb:,.0f} MB file, {args.mbps:,.0f} MB/s per connection")
+    print(f"{'case':<18}{'seconds':>10}{'MB/s':>10}{'peak MB':>10}{'parts':>7}")
+    for r in results:
+        print(
+            f"{r['case']:<18}{r['seconds']:>10.2f}{r['mb_per_second']:>10.1f}"
+            f"{r['peak_mb']:>10.1f}{r['parts']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Keep query results in Arrow and convert to pandas only when a consumer needs it."""
+
+import pandas as pd
+import pyarrow as pa
+
+
+def to_pandas(
+    table: pa.Table, exclusive: bool = False, arrow_backed: bool = False
+) -> pd.DataFrame:
+    """Convert `table` to pandas with a low memory peak.
+
+    Pass `exclusive=True` only if nothing else references `table` (e.g. it is not cached):
+    its buffers are then released column by column during conversion and the table must
+    not be used afterwards. `arrow_backed=True` keeps columns as `pd.ArrowDtype`, which
+    avoids materializing Python objects for strings and decimals.
+    """
+    return table.to_pandas(
+        split_blocks=True,
+        self_destruct=exclusive,
+        types_mapper=pd.ArrowDtype if arrow_backed else None,
+    )
+
+
+def page_count(table: pa.Table, page_size: int) -> int:
+    return max(1, -(-table.num_rows // page_size))
+
+
+def page(table: pa.Table, number: int, page_size: int) -> pa.Table:
+    """Zero-copy view of rows `[number * page_size, (number + 1) * page_size)`."""
+    return table.slice(number * page_size, page_size)
@@ -0,0 +1,103 @@
+"""Submit SQL statements without blocking, poll their state and cancel them server-side."""
+
+import time
+from typing import Callable
+
+import pyarrow as pa
+from databricks.sql.thrift_api.TCLIService import ttypes
+
+PENDING_STATES = {
+    None,
+    ttypes.TOperationState.INITIALIZED_STATE,
+    ttypes.TOperationState.PENDING_STATE,
+    ttypes.TOperationState.RUNNING_STATE,
+}
+
+
+class AsyncQuery:
+    """A statement started with `execute_async` on a connection the query holds.
+
+    Closing the query closes its cursor and hands the connection to
+    `release(discard)`, such as `ConnectionPool.release`, or closes it when no
+    `release` is given.
+    """
+
+    def __init__(
+        self, connection, cursor, release: Callable[[bool], None] | None = None
+    ):
+        self.connection = connection
+        self.cursor = cursor
+        self.started = time.monotonic()
+        self.closed = False
+        self._release = release
+
+    @classmethod
+    def submit(
+        cls,
+        connection,
+        statement: str,
+        parameters: dict | None = None,
+        arraysize=None,
+        release: Callable[[bool], None] | None = None,
+    ) -> "AsyncQuery":
+        query = cls(connection, None, release)
+        try:
+            query.cursor = (
+                connection.cursor(arraysize=arraysize)
+                if arraysize
+                else connection.cursor()
+            )
+            query.cursor.execute_async(statement, parameters)
+        except BaseException:
+            query.close(discard=True)
+            raise
+        return query
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def state(self) -> str:
+        state = self.cursor.get_query_state()
+        name = ttypes.TOperationState._VALUES_TO_NAMES.get(state, "PENDING_STATE")
+        return name.removesuffix("_STATE")
+
+    def is_pending(self) -> bool:
+        return self.cursor.get_query_state() in PENDING_STATES
+
+    def finish(self):
+        """Attach the finished result set to the cursor; raises if the query failed."""
+        return self.cursor.get_async_execution_result()
+
+    def fetch_arrow(self) -> pa.Table:
+        self.finish()
+        return self.cursor.fetchall_arrow()
+
+    def cancel(self):
+        try:
+            self.cursor.cancel()
+        finally:
+            self.close()
+
+    def __del__(self):
+        # A query abandoned together with its session still gives its connection back
+        self.close()
+
+    def close(self, discard: bool = False):
+        """Release the connection, or with `discard` drop it as no longer usable."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.cursor is not None:
+                self.cursor.close()
+        except Exception:
+            discard = True
+        if self._release is not None:
+            self._release(discard)
+            return
+        try:
+            self.connection.close()
+        except Exception:
+            pass
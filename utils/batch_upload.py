@@ -0,0 +1,191 @@
+"""Upload many files, or the members of a zip archive, to a Volume at once."""
+
+import contextlib
+import io
+import posixpath
+import time
+import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import BinaryIO, Callable
+
+from utils.multipart_upload import MultipartUploader
+from utils.upload_dedup import DedupUploader
+
+QUEUED = "queued"
+UPLOADING = "uploading"
+UPLOADED = "uploaded"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+@dataclass
+class BatchItem:
+    """A file to upload as `name`, relative to the Volume; `open()` returns a context manager."""
+
+    name: str
+    size: int
+    open: Callable[[], contextlib.AbstractContextManager[BinaryIO]]
+
+
+@dataclass
+class FileUpload:
+    name: str
+    size: int
+    state: str = QUEUED
+    sent: int = 0
+    seconds: float | None = None
+    error: str | None = None
+
+
+@dataclass
+class BatchResult:
+    uploads: list[FileUpload] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def bytes_sent(self) -> int:
+        return sum(u.sent for u in self.uploads if u.state != SKIPPED)
+
+    @property
+    def bytes_done(self) -> int:
+        """Bytes sent plus the size of files skipped as unchanged."""
+        return sum(u.size if u.state == SKIPPED else u.sent for u in self.uploads)
+
+    @property
+    def failed(self) -> list[FileUpload]:
+        return [upload for upload in self.uploads if upload.state == FAILED]
+
+    @property
+    def skipped(self) -> list[FileUpload]:
+        return [upload for upload in self.uploads if upload.state == SKIPPED]
+
+    def throughput(self) -> float:
+        """Bytes per second across the whole batch."""
+        return self.bytes_sent / self.seconds if self.seconds else 0.0
+
+    def manifest(self, volume_path: str) -> dict:
+        return {
+            "volume_path": volume_path,
+            "files": len(self.uploads),
+            "uploaded": len(self.uploads) - len(self.failed) - len(self.skipped),
+            "skipped": len(self.skipped),
+            "failed": len(self.failed),
+            "bytes": self.bytes_sent,
+            "seconds": round(self.seconds, 3),
+            "uploads": [
+                {"path": f"{volume_path}/{upload.name}", **asdict(upload)}
+                for upload in self.uploads
+            ],
+        }
+
+
+def clean_name(name: str) -> str | None:
+    """Normalize a relative file name, or return None for one that escapes the target."""
+    name = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if name in ("", ".") or name == ".." or name.startswith("../"):
+        return None
+    return name
+
+
+def file_items(files: Iterable) -> Iterator[BatchItem]:
+    """Items for seekable files with a `name`, such as Streamlit's `UploadedFile`s."""
+    for f in files:
+        name = clean_name(f.name)
+        if name is None:
+            continue
+        size = f.seek(0, io.SEEK_END)
+        f.seek(0)
+        # The caller owns the file, so uploading it must not close it
+        yield BatchItem(name, size, lambda f=f: contextlib.nullcontext(f))
+
+
+def zip_items(archive: zipfile.ZipFile, prefix: str = "") -> Iterator[BatchItem]:
+    """Items for the files in `archive`, decompressed one block at a time while uploading.
+
+    The archive must stay open until the batch is done.
+    """
+    for info in archive.infolist():
+        if info.is_dir() or info.filename.startswith("__MACOSX/"):
+            continue
+        name = clean_name(info.filename)
+        if name is None:
+            continue
+        if prefix:
+            name = posixpath.join(prefix, name)
+        yield BatchItem(name, info.file_size, lambda info=info: archive.open(info))
+
+
+def upload_batch(
+    uploader: MultipartUploader | DedupUploader,
+    volume_path: str,
+    items: Iterable[BatchItem],
+    concurrency: int = 16,
+    on_update: Callable[[BatchResult], None] | None = None,
+    update_every: float = 0.25,
+    overwrite: bool = True,
+) -> BatchResult:
+    """Upload `items` below `volume_path`, up to `concurrency` files at a time.
+
+    Files the uploader skips, by returning 0 parts, are marked as skipped.
+
+    Items are taken from `items` only as upload slots free up, so an archive is
+    expanded as it goes rather than up front. A failed file is recorded and the rest
+    carry on. `on_update(result)` is called on the calling thread every
+    `update_every` seconds while the batch runs, and once at the end.
+    """
+    volume_path = volume_path.rstrip("/")
+    result = BatchResult()
+    started = time.perf_counter()
+
+    def send(item: BatchItem, upload: FileUpload):
+        def report(sent: int, total: int):
+            upload.sent = sent
+
+        upload.state = UPLOADING
+        began = time.perf_counter()
+        try:
+            with item.open() as f:
+                parts = uploader.upload(
+                    f"{volume_path}/{item.name}",
+                    f,
+                    overwrite=overwrite,
+                    on_progress=report,
+                    size=item.size,
+                )
+        except Exception as e:
+            upload.state, upload.error = FAILED, str(e)
+        else:
+            if parts:
+                upload.state, upload.sent = UPLOADED, item.size
+            else:
+                upload.state, upload.sent = SKIPPED, 0
+        finally:
+            upload.seconds = time.perf_counter() - began
+
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="batch-upload") as executor:
+        remaining = iter(items)
+        pending = set()
+        last_update = started
+        while True:
+            # A few queued files keep every worker busy between updates
+            for item in remaining:
+                upload = FileUpload(item.name, item.size)
+                result.uploads.append(upload)
+                pending.add(executor.submit(send, item, upload))
+                if len(pending) >= 2 * concurrency:
+                    break
+            if not pending:
+                break
+            _, pending = wait(pending, update_every, return_when=FIRST_COMPLETED)
+            now = time.perf_counter()
+            if on_update is not None and now - last_update >= update_every:
+                result.seconds = now - started
+                on_update(result)
+                last_update = now
+
+    result.seconds = time.perf_counter() - started
+    if on_update is not None:
+        on_update(result)
+    return result
@@ -0,0 +1,96 @@
+"""Browse Unity Catalog catalogs, schemas and tables with cached, lazily loaded listings."""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from databricks.sdk import WorkspaceClient
+
+from utils.ttl_cache import TTLCache
+
+
+class CatalogBrowser:
+    """Lists one level of the catalog tree at a time through the SDK.
+
+    Listings are cached for `ttl` seconds. Opening a catalog prefetches the table
+    listings of up to `prefetch_limit` of its schemas in the background, each at most
+    once at a time however often the catalog is opened while they load.
+    """
+
+    def __init__(
+        self,
+        w: WorkspaceClient,
+        ttl: float = 300,
+        page_size: int = 1000,
+        prefetch_limit: int = 25,
+        max_workers: int = 4,
+    ):
+        self._w = w
+        self.page_size = page_size
+        self.prefetch_limit = prefetch_limit
+        self._cache = TTLCache(ttl)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="catalog-prefetch"
+        )
+        self._prefetching: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def catalogs(self) -> list[str]:
+        return self._cache.get_or_load(
+            ("catalogs",),
+            lambda: sorted(
+                c.name for c in self._w.catalogs.list(max_results=self.page_size)
+            ),
+        )
+
+    def schemas(self, catalog: str) -> list[str]:
+        schemas = self._cache.get_or_load(
+            ("schemas", catalog),
+            lambda: sorted(
+                s.name
+                for s in self._w.schemas.list(
+                    catalog_name=catalog, max_results=self.page_size
+                )
+            ),
+        )
+        self.prefetch_tables(catalog, schemas)
+        return schemas
+
+    def tables(self, catalog: str, schema: str) -> list[str]:
+        return self._cache.get_or_load(
+            ("tables", catalog, schema),
+            lambda: sorted(
+                t.name
+                for t in self._w.tables.list(
+                    catalog_name=catalog,
+                    schema_name=schema,
+                    max_results=self.page_size,
+                    omit_columns=True,
+                    omit_properties=True,
+                    omit_username=True,
+                )
+            ),
+        )
+
+    def prefetch_tables(self, catalog: str, schemas: list[str]):
+        for schema in schemas[: self.prefetch_limit]:
+            key = ("tables", catalog, schema)
+            with self._lock:
+                if key in self._prefetching or self._cache.contains(key):
+                    continue
+                # Failures surface again when the schema is opened in the foreground
+                future = self._executor.submit(self.tables, catalog, schema)
+                self._prefetching[key] = future
+            future.add_done_callback(lambda _, key=key: self._prefetched(key))
+
+    def _prefetched(self, key: tuple):
+        with self._lock:
+            self._prefetching.pop(key, None)
+
+    def refresh(self, catalog: str | None = None):
+        """Forget cached listings, either everything or the catalogs and those below `catalog`."""
+        if catalog is None:
+            self._cache.invalidate()
+        else:
+            self._cache.invalidate(
+                lambda key: key == ("catalogs",) or (len(key) > 1 and key[1] == catalog)
+            )
@@ -0,0 +1,177 @@
+"""Stream Volume files to the browser through a download route on the app's own server."""
+
+import gc
+import logging
+import posixpath
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import quote
+
+import streamlit
+import tornado.iostream
+import tornado.web
+from tornado.ioloop import IOLoop
+
+CHUNK_SIZE = 1024**2
+ROUTE = "volume-downloads"
+# The Streamlit release whose Tornado server `install` was checked against
+TESTED_STREAMLIT = "1.41"
+
+PENDING = "pending"
+STREAMING = "streaming"
+DONE = "done"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DownloadLink:
+    token: str
+    path: str
+    size: int | None
+    state: str = PENDING
+    sent: int = 0
+    error: str | None = None
+    created_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def file_name(self) -> str:
+        return posixpath.basename(self.path)
+
+
+class DownloadStreams:
+    """Hands out short-lived links that stream a Volume file to whoever opens them.
+
+    Opening a link downloads the file with `files.download` and relays it one
+    `chunk_size` block at a time, waiting for each block to reach the browser before
+    reading the next, so memory stays around one block per download whatever the
+    file size. Nothing is read until the link is opened. Up to `max_downloads` files
+    stream at once, and links expire `ttl` seconds after they were created.
+
+    Call `install()` once to add the route to the running Streamlit server.
+    """
+
+    def __init__(
+        self,
+        files,
+        ttl: float = 600,
+        chunk_size: int = CHUNK_SIZE,
+        max_downloads: int = 8,
+    ):
+        self.files = files
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+        self._links: dict[str, DownloadLink] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_downloads, thread_name_prefix="volume-download"
+        )
+
+    def create(self, path: str) -> DownloadLink:
+        """A link for the file at `path`; checks it exists without reading it."""
+        metadata = self.files.get_metadata(path)
+        link = DownloadLink(secrets.token_urlsafe(32), path, metadata.content_length)
+        with self._lock:
+            self._prune()
+            self._links[link.token] = link
+        return link
+
+    def get(self, token: str) -> DownloadLink | None:
+        with self._lock:
+            self._prune()
+            return self._links.get(token)
+
+    def url(self, link: DownloadLink, base_url_path: str = "") -> str:
+        base = base_url_path.strip("/")
+        return f"/{base}/{ROUTE}/{link.token}" if base else f"/{ROUTE}/{link.token}"
+
+    def install(self):
+        """Add the download route to the Tornado application serving this app.
+
+        Streamlit has no API for extra routes, so the application is looked up among
+        live objects, which relies on Streamlit serving through Tornado. The route is
+        added once per process and serves whichever `DownloadStreams` installed it
+        last. Logs a warning on Streamlit releases other than `TESTED_STREAMLIT`, and
+        logs and raises `RuntimeError` if no application is running.
+        """
+        global _streams
+        if not streamlit.__version__.startswith(f"{TESTED_STREAMLIT}."):
+            logger.warning(
+                "Adding the download route to Streamlit %s; it was checked against "
+                "%s, and later releases may serve differently.",
+                streamlit.__version__,
+                TESTED_STREAMLIT,
+            )
+        apps = [
+            app for app in gc.get_objects() if isinstance(app, tornado.web.Application)
+        ]
+        if not apps:
+            message = (
+                "No Tornado application found to add the download route to; "
+                "download links need the Streamlit server to run on Tornado."
+            )
+            logger.error(message)
+            raise RuntimeError(message)
+        _streams = self
+        for app in apps:
+            if not getattr(app, "_volume_downloads", False):
+                app.add_handlers(".*", [(rf".*/{ROUTE}/([\w-]+)", _DownloadHandler)])
+                app._volume_downloads = True
+
+    def _prune(self):
+        expired = time.monotonic() - self.ttl
+        for token, link in list(self._links.items()):
+            if link.created_at < expired and link.state != STREAMING:
+                del self._links[token]
+
+
+_streams: DownloadStreams | None = None
+
+
+class _DownloadHandler(tornado.web.RequestHandler):
+    async def get(self, token: str):
+        streams = _streams
+        link = streams.get(token) if streams is not None else None
+        if link is None:
+            raise tornado.web.HTTPError(404)
+        loop = IOLoop.current()
+        executor = streams._executor
+        link.state, link.sent, link.error = STREAMING, 0, None
+        try:
+            response = await loop.run_in_executor(
+                executor, streams.files.download, link.path
+            )
+        except Exception as e:
+            link.state, link.error = FAILED, str(e)
+            raise tornado.web.HTTPError(502) from e
+
+        contents = response.contents
+        if hasattr(contents, "set_chunk_size"):
+            contents.set_chunk_size(streams.chunk_size)
+        self.set_header("Content-Type", "application/octet-stream")
+        self.set_header(
+            "Content-Disposition",
+            f"attachment; filename*=UTF-8''{quote(link.file_name)}",
+        )
+        if response.content_length is not None:
+            self.set_header("Content-Length", response.content_length)
+        try:
+            while chunk := await loop.run_in_executor(
+                executor, contents.read, streams.chunk_size
+            ):
+                self.write(chunk)
+                # Wait for the browser to take the block before reading the next one
+                await self.flush()
+                link.sent += len(chunk)
+            link.state = DONE
+        except tornado.iostream.StreamClosedError:
+            link.state, link.error = FAILED, "The browser closed the connection."
+        except Exception as e:
+            link.state, link.error = FAILED, str(e)
+            raise
+        finally:
+            contents.close()
@@ -0,0 +1,141 @@
+"""File-like wrappers for streaming uploads to the Files API without copying them first."""
+
+import hashlib
+import io
+from typing import BinaryIO, Callable
+
+REPORT_EVERY = 4 * 1024**2
+HASH_CHUNK_SIZE = 1024**2
+
+
+class ProgressReader(io.RawIOBase):
+    """Read-only view of `f` from its current position that reports how much was read.
+
+    The HTTP client pulls the body from it in small blocks, so only one block is held
+    at a time instead of a copy of the whole file. It knows its length, which becomes
+    the Content-Length, and is seekable, so the SDK can rewind it to retry a request.
+    `on_progress(bytes_read, total)` is called each time another `report_every`
+    bytes have been read, and once the end is reached. Pass `size` when it is known,
+    for streams such as archive members that are costly to seek to their end.
+    """
+
+    def __init__(
+        self,
+        f: BinaryIO,
+        on_progress: Callable[[int, int], None] | None = None,
+        report_every: int = REPORT_EVERY,
+        size: int | None = None,
+    ):
+        self._f = f
+        self._start = f.tell()
+        if size is None:
+            size = f.seek(0, io.SEEK_END) - self._start
+            f.seek(self._start)
+        self._size = size
+        self._position = 0
+        self._on_progress = on_progress
+        self._report_every = report_every
+        self._reported = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = min(max(offset, 0), self._size)
+        self._f.seek(self._start + self._position)
+        # A rewound retry reports its progress again from there
+        self._reported = min(self._reported, self._position)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._position
+        data = self._f.read(min(size, self._size - self._position))
+        self._advance(len(data))
+        return data
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer)[: self._size - self._position]
+        count = self._f.readinto(view)
+        self._advance(count)
+        return count
+
+    def _advance(self, count: int):
+        self._position += count
+        if self._on_progress is None:
+            return
+        finished = self._position == self._size and self._reported < self._size
+        if finished or self._position - self._reported >= self._report_every:
+            self._reported = self._position
+            self._on_progress(self._position, self._size)
+
+
+class HashingReader(io.RawIOBase):
+    """Pass-through view of `f` that hashes its contents as they are read.
+
+    Reads that continue where the hash left off update it as they go, so a file
+    streamed front to back is hashed without a second pass. Parts read out of order,
+    as in a parallel upload, are skipped and read again by `hexdigest()`.
+    """
+
+    def __init__(self, f: BinaryIO, algorithm: str = "sha256"):
+        self._f = f
+        self._start = f.tell()
+        self._hash = hashlib.new(algorithm)
+        self._hashed = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self._f.seekable()
+
+    def tell(self) -> int:
+        return self._f.tell() - self._start
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            offset += self._start
+        return self._f.seek(offset, whence) - self._start
+
+    def read(self, size: int = -1) -> bytes:
+        position = self.tell()
+        data = self._f.read(size)
+        self._update(position, data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        position = self.tell()
+        count = self._f.readinto(buffer)
+        self._update(position, memoryview(buffer)[:count])
+        return count
+
+    def hexdigest(self) -> str:
+        """The hash of the whole stream, reading whatever was not hashed on the way."""
+        position = self._f.tell()
+        self._f.seek(self._start + self._hashed)
+        while chunk := self._f.read(HASH_CHUNK_SIZE):
+            self._hash.update(chunk)
+            self._hashed += len(chunk)
+        self._f.seek(position)
+        return self._hash.hexdigest()
+
+    def _update(self, position: int, data):
+        # Data partly hashed already, e.g. re-read by a retry, only adds its new tail
+        end = position + len(data)
+        if position <= self._hashed < end:
+            self._hash.update(data[self._hashed - position :])
+            self._hashed = end
@@ -0,0 +1,307 @@
+"""Upload large files to Unity Catalog Volumes in parts sent in parallel."""
+
+import hashlib
+import io
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import BinaryIO, Callable
+from urllib.parse import quote
+
+import requests
+from databricks.sdk import errors
+
+from utils.file_streams import ProgressReader
+from utils.upload_checkpoints import CheckpointStore, UploadCheckpoint
+
+PART_SIZE = 64 * 1024**2
+FILES_API = "/api/2.0/fs"
+
+# Statuses worth retrying a part for; an expired URL is replaced on the next attempt
+RETRY_STATUSES = {403, 408, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class UploadPart:
+    number: int
+    offset: int
+    size: int
+    etag: str | None = None
+
+
+def plan_parts(size: int, part_size: int) -> list[UploadPart]:
+    """Split `size` bytes into parts numbered from 1; only the last may be smaller."""
+    return [
+        UploadPart(number, offset, min(part_size, size - offset))
+        for number, offset in enumerate(range(0, size, part_size), start=1)
+    ]
+
+
+class MultipartUploadError(Exception):
+    """Cloud storage refused a part of a multipart upload."""
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class FilesMultipartAPI:
+    """The Files API's multipart upload calls, made through a `WorkspaceClient`.
+
+    Parts are sent straight to the cloud storage URLs the workspace hands out, over a
+    session of `connections` pooled connections, so they do not pass through the
+    workspace or carry its credentials.
+    """
+
+    def __init__(self, w, connections: int = 8, timeout: float = 300):
+        self._api = w.api_client
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=connections, pool_maxsize=connections
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def initiate(self, path: str, overwrite: bool) -> str | None:
+        """Start an upload and return its session token, or None if parts are not supported."""
+        try:
+            response = self._api.do(
+                "POST",
+                f"{FILES_API}/files{quote(path)}",
+                query={"action": "initiate-upload", "overwrite": overwrite},
+            )
+        except (errors.BadRequest, errors.NotImplemented):
+            # Some workspaces refuse multipart sessions instead of answering without one
+            return None
+        return (response.get("multipart_upload") or {}).get("session_token")
+
+    def part_url(self, path: str, token: str, number: int) -> tuple[str, dict]:
+        response = self._api.do(
+            "POST",
+            f"{FILES_API}/create-upload-part-urls",
+            body={
+                "path": path,
+                "session_token": token,
+                "start_part_number": number,
+                "count": 1,
+            },
+        )
+        part = response["upload_part_urls"][0]
+        headers = {h["name"]: h["value"] for h in part.get("headers", [])}
+        return part["url"], headers
+
+    def put_part(self, url: str, headers: dict, data) -> str:
+        response = self.session.put(
+            url, data=data, headers=headers, timeout=self.timeout
+        )
+        if response.status_code >= 300:
+            raise MultipartUploadError(
+                f"Part upload failed with HTTP {response.status_code}: "
+                f"{response.text[:200]}",
+                response.status_code,
+            )
+        return response.headers.get("ETag", "")
+
+    def complete(self, path: str, token: str, parts: list[UploadPart]):
+        self._api.do(
+            "POST",
+            f"{FILES_API}/files{quote(path)}",
+            query={
+                "action": "complete-upload",
+                "upload_type": "multipart",
+                "session_token": token,
+            },
+            body={"parts": [{"part_number": p.number, "etag": p.etag} for p in parts]},
+        )
+
+    def abort(self, path: str, token: str):
+        response = self._api.do(
+            "POST",
+            f"{FILES_API}/create-abort-upload-url",
+            body={"path": path, "session_token": token},
+        )
+        abort = response["abort_upload_url"]
+        headers = {h["name"]: h["value"] for h in abort.get("headers", [])}
+        self.session.delete(abort["url"], headers=headers, timeout=self.timeout)
+
+
+class MultipartUploader:
+    """Uploads files of at least `threshold` bytes as parts of `part_size` bytes.
+
+    Up to `concurrency` parts are read and sent at once, so memory stays around
+    `concurrency * part_size` whatever the file size. A failed part is retried on its
+    own, with a fresh URL, up to `max_attempts` times with exponential backoff. Smaller
+    files, and workspaces whose storage does not support parts, go through
+    `single_upload(path, f, overwrite)`, usually `WorkspaceClient().files.upload`.
+
+    With `checkpoints`, each confirmed part is recorded on disk. An upload cut short by
+    network errors or a stopped script keeps its session, and uploading the same
+    file to the same path again sends only the parts that are missing. If that session
+    has expired meanwhile, the upload starts over in a new one.
+    """
+
+    def __init__(
+        self,
+        api: FilesMultipartAPI,
+        single_upload: Callable[..., None],
+        part_size: int = PART_SIZE,
+        threshold: int | None = None,
+        concurrency: int = 8,
+        max_attempts: int = 4,
+        backoff: float = 0.5,
+        checkpoints: CheckpointStore | None = None,
+    ):
+        self.api = api
+        self.checkpoints = checkpoints
+        self.single_upload = single_upload
+        self.part_size = part_size
+        self.threshold = 2 * part_size if threshold is None else threshold
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    def upload(
+        self,
+        path: str,
+        f: BinaryIO,
+        overwrite: bool = True,
+        on_progress: Callable[[int, int], None] | None = None,
+        size: int | None = None,
+    ) -> int:
+        """Upload `f` from its current position to `path` and return the parts used.
+
+        `on_progress(bytes_sent, total)` is called on the calling thread. `size` saves
+        seeking to the end of `f` to measure it.
+        """
+        start = f.tell()
+        if size is None:
+            size = f.seek(0, io.SEEK_END) - start
+            f.seek(start)
+        if size < self.threshold:
+            token = None
+        else:
+            checkpoint = self._resume(path, size)
+            token = (
+                checkpoint.session_token
+                if checkpoint is not None
+                else self.api.initiate(path, overwrite)
+            )
+        if token is None:
+            reader = ProgressReader(f, on_progress, size=size)
+            self.single_upload(path, reader, overwrite=overwrite)
+            return 1
+
+        parts = plan_parts(size, self.part_size)
+        lock = threading.Lock()
+        resumed = checkpoint is not None
+        if self.checkpoints is not None and checkpoint is None:
+            checkpoint = UploadCheckpoint(path, size, self.part_size, token)
+            self.checkpoints.save(checkpoint)
+
+        def read(part: UploadPart) -> bytes:
+            with lock:
+                f.seek(start + part.offset)
+                return f.read(part.size)
+
+        def send(part: UploadPart):
+            data = read(part)
+            part.etag = self._send_part(path, token, part, data)
+            if checkpoint is not None:
+                with lock:
+                    checkpoint.parts[part.number] = (
+                        part.etag,
+                        hashlib.sha256(data).hexdigest(),
+                    )
+                    self.checkpoints.save(checkpoint)
+            return part
+
+        # Parts confirmed before an interruption count only if the file still matches
+        todo = []
+        for part in parts:
+            confirmed = checkpoint.parts.get(part.number) if checkpoint else None
+            if confirmed and hashlib.sha256(read(part)).hexdigest() == confirmed[1]:
+                part.etag = confirmed[0]
+            else:
+                todo.append(part)
+        if checkpoint is not None:
+            checkpoint.parts = {
+                p.number: checkpoint.parts[p.number] for p in parts if p.etag
+            }
+
+        try:
+            sent = size - sum(part.size for part in todo)
+            if sent and on_progress is not None:
+                on_progress(sent, size)
+            with ThreadPoolExecutor(
+                self.concurrency, thread_name_prefix="upload-part"
+            ) as executor:
+                # Keep only `concurrency` parts in memory instead of queueing them all
+                remaining = iter(todo)
+                pending = set()
+                while True:
+                    for part in remaining:
+                        pending.add(executor.submit(send, part))
+                        if len(pending) >= self.concurrency:
+                            break
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        sent += future.result().size
+                        if on_progress is not None:
+                            on_progress(sent, size)
+            self.api.complete(path, token, parts)
+        except BaseException as e:
+            if resumed and _is_session_gone(e):
+                # The saved session expired or was aborted, taking its parts with it
+                self.checkpoints.delete(path, size)
+                f.seek(start)
+                return self.upload(path, f, overwrite, on_progress, size)
+            # Keep an interrupted upload to resume; give up on one storage refused
+            if checkpoint is not None and not _is_permanent(e):
+                raise
+            if checkpoint is not None:
+                self.checkpoints.delete(path, size)
+            try:
+                self.api.abort(path, token)
+            except Exception:
+                pass
+            raise
+        if checkpoint is not None:
+            self.checkpoints.delete(path, size)
+        return len(parts)
+
+    def _resume(self, path: str, size: int) -> UploadCheckpoint | None:
+        if self.checkpoints is None:
+            return None
+        return self.checkpoints.load(path, size, self.part_size)
+
+    def _send_part(self, path: str, token: str, part: UploadPart, data: bytes) -> str:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                url, headers = self.api.part_url(path, token, part.number)
+                return self.api.put_part(url, headers, data)
+            except Exception as e:
+                if _is_permanent(e):
+                    raise
+                error = e
+            if attempt < self.max_attempts:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+        raise error
+
+
+def _is_session_gone(error: BaseException) -> bool:
+    """Whether `error` says the upload session no longer exists on the workspace."""
+    return isinstance(error, (errors.NotFound, errors.PermissionDenied))
+
+
+def _is_permanent(error: BaseException) -> bool:
+    """Whether retrying or resuming after `error` cannot help."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return False
+    if isinstance(error, MultipartUploadError):
+        return error.status not in RETRY_STATUSES
+    # Errors from the workspace API were already retried by the SDK where sensible
+    return isinstance(error, Exception)
@@ -0,0 +1,160 @@
+"""Build parameterized SELECT statements so the warehouse does projection, filtering and limiting."""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import pyarrow as pa
+
+OPERATORS = [
+    "=",
+    "!=",
+    "<",
+    "<=",
+    ">",
+    ">=",
+    "in",
+    "contains",
+    "starts with",
+    "is null",
+    "is not null",
+]
+COMPARISONS = {"=", "!=", "<", "<=", ">", ">="}
+UNARY_OPERATORS = {"is null", "is not null"}
+
+
+@dataclass
+class Predicate:
+    column: str
+    operator: str
+    value: Any = None
+
+
+@dataclass
+class TableQuery:
+    table_name: str
+    columns: list[str] = field(default_factory=list)
+    predicates: list[Predicate] = field(default_factory=list)
+    order_by: str | None = None
+    descending: bool = False
+    limit: int | None = None
+    sample_percent: float | None = None
+
+    def to_sql(self, schema: pa.Schema | None = None) -> tuple[str, dict]:
+        """Return the statement and its named parameters. Columns are checked against `schema` if given."""
+        known = set(schema.names) if schema is not None else None
+
+        def column(name):
+            if known is not None and name not in known:
+                raise ValueError(f"Unknown column: {name}")
+            return quote_identifier(name)
+
+        parameters = {"table_name": self.table_name}
+        projection = ", ".join(column(c) for c in self.columns) or "*"
+        statement = f"SELECT {projection} FROM IDENTIFIER(:table_name)"
+        if self.sample_percent is not None:
+            # TABLESAMPLE only takes literals; the percentage is a float we computed
+            percent = float(self.sample_percent)
+            if not 0 < percent <= 100:
+                raise ValueError(f"Sample percentage out of range: {percent}")
+            statement += f" TABLESAMPLE ({percent:.6g} PERCENT)"
+
+        conditions = []
+        for i, predicate in enumerate(self.predicates):
+            name = column(predicate.column)
+            operator = predicate.operator
+            marker = f"p{i}"
+            if operator in UNARY_OPERATORS:
+                conditions.append(f"{name} {operator.upper()}")
+            elif operator in COMPARISONS:
+                conditions.append(f"{name} {operator} :{marker}")
+                parameters[marker] = predicate.value
+            elif operator == "in":
+                values = list(predicate.value)
+                if not values:
+                    raise ValueError(
+                        f"'in' needs at least one value for {predicate.column}"
+                    )
+                markers = [f"{marker}_{j}" for j in range(len(values))]
+                conditions.append(f"{name} IN ({', '.join(':' + m for m in markers)})")
+                parameters.update(zip(markers, values))
+            elif operator == "contains":
+                conditions.append(f"contains({name}, :{marker})")
+                parameters[marker] = predicate.value
+            elif operator == "starts with":
+                conditions.append(f"startswith({name}, :{marker})")
+                parameters[marker] = predicate.value
+            else:
+                raise ValueError(f"Unsupported operator: {operator}")
+
+        if conditions:
+            statement += " WHERE " + " AND ".join(conditions)
+        if self.order_by:
+            statement += f" ORDER BY {column(self.order_by)}"
+            statement += " DESC" if self.descending else " ASC"
+        if self.limit:
+            statement += " LIMIT :row_limit"
+            parameters["row_limit"] = int(self.limit)
+        return statement, parameters
+
+
+def quote_identifier(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def split_identifier(name: str) -> list[str]:
+    """Split a dotted, optionally backtick-quoted name like `a`.b.`c.d` into its parts."""
+    parts, part, quoted, i = [], "", False, 0
+    while i < len(name):
+        char = name[i]
+        if char == "`":
+            if quoted and name[i + 1 : i + 2] == "`":
+                part += "`"
+                i += 1
+            else:
+                quoted = not quoted
+        elif char == "." and not quoted:
+            parts.append(part.strip())
+            part = ""
+        else:
+            part += char
+        i += 1
+    if quoted:
+        raise ValueError(f"Unbalanced backticks in name: {name}")
+    parts.append(part.strip())
+    return parts
+
+
+def coerce_value(text: str, data_type: pa.DataType) -> Any:
+    """Convert a user-entered string into a Python value matching the column's Arrow type."""
+    text = text.strip()
+    if pa.types.is_integer(data_type):
+        return int(text)
+    if pa.types.is_floating(data_type):
+        return float(text)
+    if pa.types.is_decimal(data_type):
+        return Decimal(text)
+    if pa.types.is_boolean(data_type):
+        if text.lower() not in ("true", "false"):
+            raise ValueError(f"Expected true or false, got {text!r}")
+        return text.lower() == "true"
+    if pa.types.is_timestamp(data_type):
+        return datetime.fromisoformat(text)
+    if pa.types.is_date(data_type):
+        return date.fromisoformat(text)
+    return text
+
+
+def build_predicate(
+    column: str, operator: str, text: str, schema: pa.Schema
+) -> Predicate:
+    data_type = schema.field(column).type
+    if operator in UNARY_OPERATORS:
+        return Predicate(column, operator)
+    if operator == "in":
+        values = [coerce_value(v, data_type) for v in text.split(",") if v.strip()]
+        return Predicate(column, operator, values)
+    if operator in ("contains", "starts with"):
+        return Predicate(column, operator, text)
+    return Predicate(column, operator, coerce_value(text, data_type))
@@ -0,0 +1,63 @@
+"""Process-wide LRU cache of Arrow query results bounded by a byte budget."""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+import pyarrow as pa
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    entries: int
+    bytes_held: int
+    max_bytes: int
+
+
+class ArrowResultCache:
+    """Thread-safe LRU of `pyarrow.Table` results, evicting least recently used entries over `max_bytes`."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, pa.Table] = OrderedDict()
+        self._bytes_held = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> pa.Table | None:
+        with self._lock:
+            table = self._entries.get(key)
+            if table is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return table
+
+    def put(self, key: Hashable, table: pa.Table):
+        size = table.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes_held -= previous.nbytes
+            self._entries[key] = table
+            self._bytes_held += size
+            while self._bytes_held > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes_held -= evicted.nbytes
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._entries),
+                bytes_held=self._bytes_held,
+                max_bytes=self.max_bytes,
+            )
@@ -0,0 +1,105 @@
+"""Spill Arrow query results to local disk and reopen them memory-mapped.
+
+Every process that opens the same file maps the same page-cache pages, so several app
+processes serving the same hot table share one physical copy instead of each holding
+its own.
+"""
+
+import hashlib
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Hashable
+
+import pyarrow as pa
+
+SUFFIX = ".arrow"
+PARTIAL_SUFFIX = ".partial"
+
+
+@dataclass
+class SpillStats:
+    files: int
+    bytes_on_disk: int
+    max_bytes: int
+
+
+class ArrowSpillStore:
+    """Arrow IPC files in `directory`, evicting least recently used files above `max_bytes`."""
+
+    def __init__(self, directory: str | os.PathLike, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: Hashable) -> pa.Table | None:
+        path = self._path(key)
+        try:
+            source = pa.memory_map(str(path), "r")
+        except FileNotFoundError:
+            return None
+        # The modification time doubles as last access time for eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return pa.ipc.open_file(source).read_all()
+
+    def put(self, key: Hashable, table: pa.Table) -> pa.Table:
+        """Write `table` to disk and return the memory-mapped copy to use in its place."""
+        if table.nbytes > self.max_bytes:
+            return table
+        path = self._path(key)
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}")
+        # Uncompressed IPC so reading back is zero-copy from the mapping
+        with pa.OSFile(str(partial), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(partial, path)
+        self.evict()
+        mapped = self.get(key)
+        return table if mapped is None else mapped
+
+    def evict(self):
+        files = []
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        # Processes that still map an evicted file keep reading it until they let go
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def cleanup(self, partial_age: float = 600):
+        """Remove partial writes left behind by crashed processes and enforce the size budget."""
+        cutoff = time.time() - partial_age
+        for path in self.directory.glob(f"*{PARTIAL_SUFFIX}"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+        self.evict()
+
+    def stats(self) -> SpillStats:
+        sizes = []
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                sizes.append(path.stat().st_size)
+            except FileNotFoundError:
+                pass
+        return SpillStats(
+            files=len(sizes), bytes_on_disk=sum(sizes), max_bytes=self.max_bytes
+        )
+
+    def _path(self, key: Hashable) -> Path:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self.directory / f"{digest}{SUFFIX}"
@@ -0,0 +1,165 @@
+"""Bounded, thread-safe pool of Databricks SQL connections."""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+from databricks.sql.exc import InterfaceError, OperationalError
+
+# Errors after which a connection can no longer be trusted and is replaced.
+BROKEN_CONNECTION_ERRORS = (InterfaceError, OperationalError)
+
+
+@dataclass
+class PoolStats:
+    max_size: int
+    in_use: int
+    idle: int
+    created: int
+    reconnects: int
+    checkouts: int
+    waits: int
+    timeouts: int
+
+
+class _PooledConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """Hands out at most `max_size` connections created by `connect`.
+
+    Checked-out connections are probed with `SELECT 1` when they sat idle longer than
+    `probe_after` seconds and are replaced transparently if the probe fails. Idle
+    connections are closed after `idle_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], object],
+        max_size: int = 8,
+        idle_timeout: float = 300,
+        probe_after: float = 30,
+        checkout_timeout: float = 60,
+    ):
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.probe_after = probe_after
+        self.checkout_timeout = checkout_timeout
+        self._idle: list[_PooledConnection] = []
+        self._in_use = 0
+        self._created = 0
+        self._reconnects = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        pooled = self.checkout(timeout)
+        try:
+            yield pooled.conn
+        except BROKEN_CONNECTION_ERRORS:
+            self.release(pooled, discard=True)
+            raise
+        except BaseException:
+            self.release(pooled)
+            raise
+        else:
+            self.release(pooled)
+
+    def checkout(self, timeout: float | None = None) -> _PooledConnection:
+        deadline = time.monotonic() + (
+            self.checkout_timeout if timeout is None else timeout
+        )
+        with self._cond:
+            expired = self._take_expired()
+            while not self._idle and self._in_use + len(self._idle) >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise TimeoutError(
+                        f"No SQL connection available within the checkout timeout "
+                        f"({self.max_size} in use)"
+                    )
+                self._waits += 1
+                self._cond.wait(remaining)
+            pooled = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            self._checkouts += 1
+
+        for stale in expired:
+            _close_quietly(stale.conn)
+
+        try:
+            if pooled is not None and not self._is_healthy(pooled):
+                _close_quietly(pooled.conn)
+                pooled = None
+                with self._cond:
+                    self._reconnects += 1
+            if pooled is None:
+                pooled = _PooledConnection(self._connect())
+                with self._cond:
+                    self._created += 1
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return pooled
+
+    def release(self, pooled: _PooledConnection, discard: bool = False):
+        if discard:
+            _close_quietly(pooled.conn)
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            if not discard:
+                self._idle.append(pooled)
+            self._cond.notify()
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            return PoolStats(
+                max_size=self.max_size,
+                in_use=self._in_use,
+                idle=len(self._idle),
+                created=self._created,
+                reconnects=self._reconnects,
+                checkouts=self._checkouts,
+                waits=self._waits,
+                timeouts=self._timeouts,
+            )
+
+    def _take_expired(self) -> list[_PooledConnection]:
+        now = time.monotonic()
+        expired = [p for p in self._idle if now - p.last_used > self.idle_timeout]
+        if expired:
+            self._idle = [p for p in self._idle if p not in expired]
+        return expired
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        if not getattr(pooled.conn, "open", True):
+            return False
+        if time.monotonic() - pooled.last_used < self.probe_after:
+            return True
+        try:
+            with pooled.conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
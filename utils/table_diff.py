@@ -0,0 +1,294 @@
+"""Work out which rows an edit inserted, updated and deleted."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class Changeset:
+    """Rows to write back.
+
+    Without keys, rows are compared whole: an edited row shows up as deleted and
+    inserted, and `deleted` carries complete rows instead of just the key columns.
+    """
+
+    keys: list[str]
+    inserted: pd.DataFrame
+    updated: pd.DataFrame
+    deleted: pd.DataFrame
+
+    @property
+    def empty(self) -> bool:
+        return self.inserted.empty and self.updated.empty and self.deleted.empty
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.inserted)} inserted, {len(self.updated)} updated, "
+            f"{len(self.deleted)} deleted"
+        )
+
+
+def diff_by_key(
+    original: pd.DataFrame, edited: pd.DataFrame, keys: list[str]
+) -> Changeset:
+    """Compare two versions of a table row by row, matching rows on `keys`."""
+    if not keys:
+        raise ValueError("At least one key column is required")
+    if edited[keys].isna().any(axis=None):
+        raise ValueError(f"Key columns must not be empty: {', '.join(keys)}")
+    duplicated = edited.duplicated(subset=keys)
+    if duplicated.any():
+        raise ValueError(f"{duplicated.sum()} rows repeat an existing key")
+    # Unity Catalog does not enforce primary keys, so the table itself may repeat them
+    duplicated = original.duplicated(subset=keys)
+    if duplicated.any():
+        raise ValueError(
+            f"The table holds {duplicated.sum()} rows that repeat a key of "
+            f"{', '.join(keys)}, so rows cannot be matched by key"
+        )
+
+    before = original.set_index(keys)
+    after = edited.set_index(keys)[before.columns]
+
+    inserted = after.index.difference(before.index)
+    deleted = before.index.difference(after.index)
+    common = before.index.intersection(after.index)
+
+    old, new = before.loc[common], after.loc[common]
+    # Values that are missing on both sides count as unchanged
+    unchanged = (old == new) | (old.isna() & new.isna())
+    updated = new[~unchanged.all(axis=1)]
+
+    return Changeset(
+        keys=keys,
+        inserted=after.loc[inserted].reset_index()[edited.columns],
+        updated=updated.reset_index()[edited.columns],
+        deleted=before.loc[deleted].reset_index()[keys],
+    )
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Return one 64-bit hash per row, computed column-wise rather than row by row."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def diff_rows(
+    original: pd.DataFrame,
+    edited: pd.DataFrame,
+    original_hashes: np.ndarray | None = None,
+) -> Changeset:
+    """Compare two versions of a table without keys, counting repeated rows as a multiset."""
+    if original_hashes is None:
+        original_hashes = row_hashes(original)
+    edited_hashes = row_hashes(edited[original.columns])
+    if _distinct(original_hashes) and _distinct(edited_hashes):
+        inserted = ~pd.Series(edited_hashes).isin(original_hashes).to_numpy()
+        deleted = ~pd.Series(original_hashes).isin(edited_hashes).to_numpy()
+    else:
+        inserted = _unmatched(edited_hashes, original_hashes)
+        deleted = _unmatched(original_hashes, edited_hashes)
+    return Changeset(
+        keys=[],
+        inserted=edited[inserted],
+        updated=edited.iloc[:0],
+        deleted=original[deleted],
+    )
+
+
+class TableDiff:
+    """Diffs edits of one original table, hashing the original only once.
+
+    When given the `st.data_editor` editing state, only the rows it touched are
+    compared, so the cost follows the size of the edit rather than the table. The
+    original must keep the positional index the editor state refers to.
+    """
+
+    def __init__(self, original: pd.DataFrame):
+        self.original = original
+        self._hashes: np.ndarray | None = None
+        self._key_index: dict[tuple, pd.Index] = {}
+
+    @property
+    def hashes(self) -> np.ndarray:
+        if self._hashes is None:
+            self._hashes = row_hashes(self.original)
+        return self._hashes
+
+    def compare(
+        self,
+        edited: pd.DataFrame,
+        keys: list[str] | None = None,
+        editor_state: Mapping | None = None,
+    ) -> Changeset:
+        touched = self._touched(edited, editor_state) if editor_state else None
+        if touched is None:
+            if keys:
+                return diff_by_key(self.original, edited, keys)
+            return diff_rows(self.original, edited, self.hashes)
+
+        positions, before, after = touched
+        if not keys:
+            return diff_rows(before, after, self.hashes[positions])
+        changeset = diff_by_key(before, after, keys)
+        self._check_new_keys(changeset, positions, keys)
+        return changeset
+
+    def _touched(self, edited: pd.DataFrame, state: Mapping):
+        edited_rows = [int(p) for p in state.get("edited_rows", {})]
+        deleted_rows = [int(p) for p in state.get("deleted_rows", [])]
+        added = len(state.get("added_rows", []))
+        # Fall back to a full comparison if the state does not describe `edited`
+        if len(edited) != len(self.original) - len(deleted_rows) + added:
+            return None
+
+        positions = np.array(sorted(set(edited_rows) | set(deleted_rows)), dtype=int)
+        kept = self.original.index[sorted(set(edited_rows) - set(deleted_rows))]
+        if not kept.isin(edited.index).all():
+            return None
+        after = pd.concat(
+            [edited.loc[kept], edited.iloc[len(edited) - added :]]
+        ).reset_index(drop=True)
+        before = self.original.iloc[positions].reset_index(drop=True)
+        return positions, before, after
+
+    def _check_new_keys(self, changeset: Changeset, positions, keys: list[str]):
+        """Reject keys that were added or edited into values held by untouched rows."""
+        if changeset.inserted.empty:
+            return
+        index = self._key_index.get(tuple(keys))
+        if index is None:
+            index = pd.MultiIndex.from_frame(self.original[keys])
+            self._key_index[tuple(keys)] = index
+        clashes = index.isin(pd.MultiIndex.from_frame(changeset.inserted[keys]))
+        clashes[positions] = False
+        if clashes.any():
+            raise ValueError(f"{clashes.sum()} rows repeat an existing key")
+
+
+def _distinct(hashes: np.ndarray) -> bool:
+    return not pd.Series(hashes).duplicated().any()
+
+
+def _unmatched(hashes: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Mask the rows left over after pairing equal hashes with `other` one to one."""
+    if not len(other):
+        return np.ones(len(hashes), dtype=bool)
+    values, counts = np.unique(other, return_counts=True)
+    positions = np.minimum(np.searchsorted(values, hashes), len(values) - 1)
+    available = np.where(values[positions] == hashes, counts[positions], 0)
+    return _occurrence(hashes) >= available
+
+
+def _occurrence(hashes: np.ndarray) -> np.ndarray:
+    """Number each row by how many earlier rows share its hash."""
+    order = np.argsort(hashes, kind="stable")
+    ordered = hashes[order]
+    steps = np.arange(len(hashes))
+    starts = np.ones(len(hashes), dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    first = np.maximum.accumulate(np.where(starts, steps, 0))
+    occurrence = np.empty(len(hashes), dtype=np.int64)
+    occurrence[order] = steps - first
+    return occurrence
+
+
+CDF_COLUMNS = ["_change_type", "_commit_version", "_commit_timestamp"]
+
+
+@dataclass
+class MergeResult:
+    """Our changes rebased onto concurrent ones, and the keys both sides changed differently."""
+
+    changeset: Changeset
+    conflicts: list[tuple]
+
+
+def latest_changes(changes: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Reduce Change Data Feed rows to the last state of each changed key, indexed by key."""
+    rows = changes[changes["_change_type"] != "update_preimage"]
+    rows = rows.sort_values("_commit_version", kind="stable")
+    return rows.drop_duplicates(subset=keys, keep="last").set_index(keys)
+
+
+def three_way_merge(
+    base: pd.DataFrame, ours: Changeset, theirs: pd.DataFrame
+) -> MergeResult:
+    """Combine our edits of `base` with the rows others changed since it was read.
+
+    `theirs` holds Change Data Feed rows. Rows only one side touched need nothing. When
+    both sides updated a row, their values are kept for the columns we did not change,
+    and it only conflicts if both changed the same column to different values. Any
+    other combination of changes to the same key conflicts, unless both sides made
+    the same change.
+    """
+    keys = ours.keys
+    latest = latest_changes(theirs, keys)
+    change_types = latest["_change_type"]
+    latest = latest.drop(columns=CDF_COLUMNS, errors="ignore")
+    before = base.set_index(keys)
+    conflicts = []
+
+    updated = ours.updated.set_index(keys)
+    merged = []
+    for key in updated.index.intersection(latest.index):
+        if change_types[key] == "delete":
+            conflicts.append(_as_tuple(key))
+            continue
+        row, original, current = updated.loc[key], before.loc[key], latest.loc[key]
+        result = current.copy()
+        for column in updated.columns:
+            if _same(row[column], original[column]):
+                continue
+            if not _same(current[column], original[column]) and not _same(
+                current[column], row[column]
+            ):
+                conflicts.append(_as_tuple(key))
+                break
+            result[column] = row[column]
+        else:
+            merged.append((key, result))
+    for key, result in merged:
+        updated.loc[key] = result
+
+    deleted = ours.deleted.set_index(keys)
+    for key in deleted.index.intersection(latest.index):
+        if change_types[key] != "delete":
+            conflicts.append(_as_tuple(key))
+
+    inserted = ours.inserted.set_index(keys)
+    unchanged_inserts = []
+    for key in inserted.index.intersection(latest.index):
+        if change_types[key] == "delete":
+            continue
+        current = latest.loc[key]
+        if all(_same(inserted.loc[key, c], current[c]) for c in inserted.columns):
+            unchanged_inserts.append(key)
+        else:
+            conflicts.append(_as_tuple(key))
+
+    return MergeResult(
+        changeset=Changeset(
+            keys=keys,
+            inserted=inserted.drop(index=unchanged_inserts).reset_index()[
+                ours.inserted.columns
+            ],
+            updated=updated.reset_index()[ours.updated.columns],
+            deleted=ours.deleted,
+        ),
+        conflicts=conflicts,
+    )
+
+
+def _same(a, b) -> bool:
+    if np.ndim(a) or np.ndim(b):
+        return np.array_equal(a, b)
+    if pd.isna(a) and pd.isna(b):
+        return True
+    return bool(a == b)
+
+
+def _as_tuple(key) -> tuple:
+    return key if isinstance(key, tuple) else (key,)
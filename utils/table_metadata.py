@@ -0,0 +1,149 @@
+"""Cheap metadata lookups for Delta tables."""
+
+import re
+from dataclasses import dataclass
+
+import pandas as pd
+from databricks.sql.exc import ServerOperationError
+
+from utils.query_builder import quote_identifier, split_identifier
+
+# Delta operations that rewrite files or change table metadata but leave every row as
+# it was, including those run by predictive optimization
+MAINTENANCE_OPERATIONS = {
+    "ADD CONSTRAINT",
+    "CHANGE COLUMN",
+    "CLUSTER BY",
+    "DROP CONSTRAINT",
+    "OPTIMIZE",
+    "REORG",
+    "SET TBLPROPERTIES",
+    "UNSET TBLPROPERTIES",
+    "UPGRADE PROTOCOL",
+    "VACUUM END",
+    "VACUUM START",
+}
+
+
+@dataclass
+class TableDetail:
+    format: str
+    size_in_bytes: int
+    num_files: int
+    estimated_rows: int | None
+
+
+def get_table_version(table_name: str, conn) -> int | None:
+    """Return the latest Delta version of `table_name`, or None if it has no Delta history (e.g. a view)."""
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                "DESCRIBE HISTORY IDENTIFIER(:table_name) LIMIT 1",
+                {"table_name": table_name},
+            )
+        except ServerOperationError:
+            return None
+        row = cursor.fetchone()
+        return row.version if row else None
+
+
+def get_data_changes(
+    table_name: str, since: int, until: int, conn
+) -> list[tuple[int, str]]:
+    """Return the `(version, operation)` commits after `since` up to `until` that may have changed rows.
+
+    Commits of `MAINTENANCE_OPERATIONS` are left out; any other operation counts.
+    """
+    with conn.cursor() as cursor:
+        # History is listed newest first; only the commits after `since` are needed
+        cursor.execute(
+            f"DESCRIBE HISTORY IDENTIFIER(:table_name) LIMIT {int(until - since)}",
+            {"table_name": table_name},
+        )
+        return [
+            (row.version, row.operation)
+            for row in cursor.fetchall()
+            if since < row.version <= until
+            and row.operation not in MAINTENANCE_OPERATIONS
+        ]
+
+
+def get_table_detail(table_name: str, conn) -> TableDetail | None:
+    """Return size and file count from DESCRIBE DETAIL, or None for views and non-Delta tables.
+
+    The row estimate comes from the table statistics and is only available once
+    `ANALYZE TABLE ... COMPUTE STATISTICS` has been run.
+    """
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                "DESCRIBE DETAIL IDENTIFIER(:table_name)", {"table_name": table_name}
+            )
+        except ServerOperationError:
+            return None
+        detail = cursor.fetchone()
+        if detail is None or detail.sizeInBytes is None:
+            return None
+
+        estimated_rows = None
+        cursor.execute(
+            "DESCRIBE TABLE EXTENDED IDENTIFIER(:table_name)",
+            {"table_name": table_name},
+        )
+        for row in cursor.fetchall():
+            if row.col_name == "Statistics":
+                match = re.search(r"(\d+) rows", row.data_type or "")
+                estimated_rows = int(match.group(1)) if match else None
+                break
+
+        return TableDetail(
+            format=detail.format,
+            size_in_bytes=detail.sizeInBytes,
+            num_files=detail.numFiles,
+            estimated_rows=estimated_rows,
+        )
+
+
+def get_primary_key(table_name: str, conn) -> list[str]:
+    """Return the declared primary key columns of a three-part `table_name`, or [] if none.
+
+    Catalogs without an information schema, such as `hive_metastore`, have no keys.
+    Schema and table names are matched case-insensitively, like Unity Catalog does.
+    """
+    parts = split_identifier(table_name)
+    if len(parts) != 3:
+        return []
+    catalog, schema, table = parts
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"SELECT k.column_name "
+                f"FROM {quote_identifier(catalog)}.information_schema.table_constraints c "
+                f"JOIN {quote_identifier(catalog)}.information_schema.key_column_usage k "
+                f"USING (constraint_catalog, constraint_schema, constraint_name) "
+                f"WHERE lower(c.table_schema) = lower(:schema) "
+                f"AND lower(c.table_name) = lower(:table) "
+                f"AND c.constraint_type = 'PRIMARY KEY' "
+                f"ORDER BY k.ordinal_position",
+                {"schema": schema, "table": table},
+            )
+        except ServerOperationError:
+            return []
+        return [row.column_name for row in cursor.fetchall()]
+
+
+def get_changes_since(table_name: str, version: int, conn) -> pd.DataFrame | None:
+    """Return the Change Data Feed rows committed after `version`.
+
+    Returns None if the feed is unavailable, e.g. because `delta.enableChangeDataFeed`
+    is not set on the table or the versions have been vacuumed.
+    """
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                "SELECT * FROM table_changes(:table_name, :start)",
+                {"table_name": table_name, "start": version + 1},
+            )
+        except ServerOperationError:
+            return None
+        return cursor.fetchall_arrow().to_pandas()
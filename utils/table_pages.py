@@ -0,0 +1,190 @@
+"""Edit a large table one keyset-paginated window at a time."""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+
+import pandas as pd
+
+from utils.query_builder import quote_identifier
+from utils.table_diff import Changeset, diff_by_key
+from utils.table_writer import to_parameter
+
+
+def build_page_query(
+    table_name: str,
+    keys: list[str],
+    after: tuple | None,
+    page_size: int,
+    version: int | None = None,
+) -> tuple[str, dict]:
+    """Return the statement reading the `page_size` rows whose keys sort after `after`."""
+    statement = f"SELECT * FROM {table_name}"
+    if version is not None:
+        statement += f" VERSION AS OF {int(version)}"
+    parameters = {"page_size": page_size}
+    if after is not None:
+        # (k1, k2) > (a1, a2) spelled out, since row values cannot be compared directly
+        terms = []
+        for i, key in enumerate(keys):
+            equal = [
+                f"{quote_identifier(k)} = :after{j}" for j, k in enumerate(keys[:i])
+            ]
+            terms.append(" AND ".join([*equal, f"{quote_identifier(key)} > :after{i}"]))
+            parameters[f"after{i}"] = after[i]
+        statement += " WHERE " + " OR ".join(f"({term})" for term in terms)
+    order = ", ".join(quote_identifier(k) for k in keys)
+    return f"{statement} ORDER BY {order} LIMIT :page_size", parameters
+
+
+class TablePages:
+    """Windows of `page_size` rows ordered by `keys`, plus the edits made to each.
+
+    Only the last `max_pages` windows are kept; an evicted window is read again from the
+    same table version when revisited. Edits are kept per window as changesets, so
+    memory follows the number of rows viewed and changed rather than the table size.
+    `fetch(statement, parameters)` runs a query and returns its rows as a DataFrame.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        keys: list[str],
+        fetch: Callable[[str, dict], pd.DataFrame],
+        page_size: int = 1_000,
+        version: int | None = None,
+        executor: Executor | None = None,
+        max_pages: int = 3,
+    ):
+        self.table_name = table_name
+        self.keys = keys
+        self.page_size = page_size
+        self.version = version
+        self.current = 0
+        self.visit = 0
+        self._fetch = fetch
+        self._executor = executor
+        self._max_pages = max_pages
+        self._pages: OrderedDict[int, pd.DataFrame] = OrderedDict()
+        self._pending: dict[int, Future] = {}
+        self._ends: dict[int, tuple] = {}
+        self._changes: dict[int, Changeset] = {}
+        self._originals: dict[int, pd.DataFrame] = {}
+        self._view: tuple[tuple[int, int], pd.DataFrame] | None = None
+        self._lock = threading.Lock()
+
+    def page(self, number: int) -> pd.DataFrame:
+        with self._lock:
+            if number in self._pages:
+                self._pages.move_to_end(number)
+                return self._pages[number]
+            pending = self._pending.pop(number, None)
+        df = pending.result() if pending is not None else self._read(number)
+        with self._lock:
+            self._pages[number] = df
+            while len(self._pages) > self._max_pages:
+                self._pages.popitem(last=False)
+        if len(df) == self.page_size:
+            self.prefetch(number + 1)
+        return df
+
+    def is_last(self, number: int) -> bool:
+        return len(self.page(number)) < self.page_size
+
+    def prefetch(self, number: int):
+        """Start reading window `number` in the background if it is not held already."""
+        if self._executor is None:
+            return
+        with self._lock:
+            if number in self._pages or number in self._pending:
+                return
+            if number - 1 not in self._ends:
+                return
+            self._pending[number] = self._executor.submit(self._read, number)
+
+    def go(self, number: int):
+        self.current = number
+        self.visit += 1
+
+    @property
+    def editor_key(self) -> str:
+        return f"page-{id(self)}-{self.current}-{self.visit}"
+
+    def view(self) -> pd.DataFrame:
+        """The current window with its earlier edits applied, fixed for this visit."""
+        visit = (self.current, self.visit)
+        if self._view is None or self._view[0] != visit:
+            self._view = (visit, self._apply(self.current))
+        return self._view[1]
+
+    def record(self, number: int, edited: pd.DataFrame) -> Changeset:
+        """Diff the editor's copy of window `number` against the table and keep the result."""
+        original = self.page(number)
+        changeset = diff_by_key(original, edited, self.keys)
+        if changeset.empty:
+            self._changes.pop(number, None)
+            self._originals.pop(number, None)
+        else:
+            self._changes[number] = changeset
+            touched = pd.concat([changeset.updated[self.keys], changeset.deleted])
+            self._originals[number] = original.merge(touched, on=self.keys)
+        return changeset
+
+    @property
+    def edited_pages(self) -> int:
+        return len(self._changes)
+
+    def changeset(self) -> Changeset:
+        """All buffered edits as one changeset."""
+        changesets = list(self._changes.values())
+        if not changesets:
+            empty = pd.DataFrame(columns=self.keys)
+            return Changeset(self.keys, empty, empty, empty)
+        return Changeset(
+            keys=self.keys,
+            inserted=pd.concat([c.inserted for c in changesets], ignore_index=True),
+            updated=pd.concat([c.updated for c in changesets], ignore_index=True),
+            deleted=pd.concat([c.deleted for c in changesets], ignore_index=True),
+        )
+
+    def originals(self) -> pd.DataFrame:
+        """The rows as read before they were updated or deleted, for three-way merges."""
+        if not self._originals:
+            return pd.DataFrame(columns=self.keys)
+        return pd.concat(self._originals.values(), ignore_index=True)
+
+    def close(self):
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+
+    def _read(self, number: int) -> pd.DataFrame:
+        with self._lock:
+            after = self._ends.get(number - 1) if number else None
+        if number and after is None:
+            raise ValueError(f"Window {number} must be read after window {number - 1}")
+        statement, parameters = build_page_query(
+            self.table_name, self.keys, after, self.page_size, self.version
+        )
+        df = self._fetch(statement, parameters).reset_index(drop=True)
+        if len(df):
+            with self._lock:
+                last = df[self.keys].iloc[-1]
+                self._ends[number] = tuple(to_parameter(v) for v in last)
+        return df
+
+    def _apply(self, number: int) -> pd.DataFrame:
+        df = self.page(number)
+        changeset = self._changes.get(number)
+        if changeset is None:
+            return df
+        rows = df.set_index(self.keys)
+        deleted = pd.MultiIndex.from_frame(changeset.deleted[self.keys])
+        rows = rows[~pd.MultiIndex.from_frame(df[self.keys]).isin(deleted)]
+        updated = changeset.updated.set_index(self.keys)
+        # Assign rather than DataFrame.update, which skips values edited to NULL
+        rows.loc[updated.index, updated.columns] = updated
+        rows = rows.reset_index()[df.columns]
+        return pd.concat([rows, changeset.inserted], ignore_index=True)
@@ -0,0 +1,72 @@
+"""Page through SQL query results as Arrow batches without materializing the whole result."""
+
+from collections import OrderedDict
+from typing import Callable
+
+import pyarrow as pa
+
+
+class TableStream:
+    """Fetches a query result one page at a time and keeps at most `max_bytes` of pages.
+
+    The stream owns the cursor; `on_close()` is called after closing it, for example
+    to release the connection the query ran on.
+    """
+
+    def __init__(
+        self,
+        cursor,
+        page_size: int = 10_000,
+        max_bytes: int = 256 * 1024**2,
+        on_close: Callable[[], None] | None = None,
+    ):
+        self.cursor = cursor
+        self.on_close = on_close
+        self.page_size = page_size
+        self.max_bytes = max_bytes
+        self.pages: OrderedDict[int, pa.Table] = OrderedDict()
+        self.held_bytes = 0
+        self.pages_fetched = 0
+        self.rows_fetched = 0
+        self.exhausted = False
+
+    def page(self, number: int) -> pa.Table | None:
+        """Return page `number`, fetching forward as needed. None if evicted or past the end."""
+        while number >= self.pages_fetched and not self.exhausted:
+            self._fetch_next()
+        if number in self.pages:
+            self.pages.move_to_end(number)
+        return self.pages.get(number)
+
+    def is_evicted(self, number: int) -> bool:
+        return number < self.pages_fetched and number not in self.pages
+
+    def close(self):
+        self.pages.clear()
+        self.held_bytes = 0
+        self.exhausted = True
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
+        if self.on_close is not None:
+            self.on_close()
+
+    def _fetch_next(self):
+        batch = self.cursor.fetchmany_arrow(self.page_size)
+        if batch.num_rows < self.page_size:
+            self.exhausted = True
+        if batch.num_rows == 0:
+            return
+
+        self.pages[self.pages_fetched] = batch
+        self.held_bytes += batch.nbytes
+        self.pages_fetched += 1
+        self.rows_fetched += batch.num_rows
+        self._evict()
+
+    def _evict(self):
+        # Least recently viewed pages go first; the newest page always stays.
+        while self.held_bytes > self.max_bytes and len(self.pages) > 1:
+            _, evicted = self.pages.popitem(last=False)
+            self.held_bytes -= evicted.nbytes
@@ -0,0 +1,379 @@
+"""Statements that write edited DataFrames back to Delta tables."""
+
+import os
+import tempfile
+import uuid
+from collections.abc import Callable, Iterator
+from functools import lru_cache
+from itertools import chain
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.query_builder import quote_identifier
+from utils.table_diff import Changeset, three_way_merge
+from utils.table_metadata import (
+    get_changes_since,
+    get_data_changes,
+    get_table_version,
+)
+
+CHANGE_COLUMN = "__change"
+
+# Rough wire size of one bound parameter besides its value: name, type and framing
+PARAMETER_OVERHEAD = 48
+STAGING_FOLDER = "_staging"
+
+
+class WriteConflict(Exception):
+    """The table changed since it was read in a way the edits cannot be merged with."""
+
+
+def to_parameter(value: Any) -> Any:
+    """Convert a DataFrame cell into a type the SQL connector can bind as a parameter."""
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        value = value.item()
+        return None if isinstance(value, float) and np.isnan(value) else value
+    return value
+
+
+def column_parameters(column: pd.Series) -> list:
+    """Convert a whole column to bindable values at once instead of cell by cell."""
+    if isinstance(column.dtype, pd.DatetimeTZDtype):
+        return [to_parameter(value) for value in column.tolist()]
+    if pd.api.types.is_datetime64_dtype(column.dtype):
+        # Microsecond precision converts to datetime.datetime rather than integers
+        values = column.to_numpy().astype("datetime64[us]").astype(object)
+    else:
+        # Numeric NumPy columns come out as Python ints, floats and bools
+        values = column.to_numpy(dtype=object)
+    missing = column.isna().to_numpy()
+    if missing.any():
+        values[missing] = None
+    return values.tolist()
+
+
+def estimate_row_bytes(df: pd.DataFrame) -> np.ndarray:
+    """Approximate the statement and parameter bytes each row adds to an INSERT."""
+    sizes = np.full(len(df), PARAMETER_OVERHEAD * len(df.columns), dtype=np.int64)
+    for _, column in df.items():
+        if column.dtype == object or pd.api.types.is_string_dtype(column.dtype):
+            lengths = column.astype("string").str.len().fillna(0)
+            sizes += lengths.to_numpy(dtype=np.int64)
+        else:
+            sizes += 8
+    return sizes
+
+
+def plan_batches(
+    df: pd.DataFrame, max_rows: int, max_bytes: int
+) -> list[tuple[int, int]]:
+    """Split the rows of `df` into (start, stop) ranges under both budgets.
+
+    A single row larger than `max_bytes` still gets a batch of its own.
+    """
+    ends = np.cumsum(estimate_row_bytes(df))
+    batches = []
+    start = 0
+    while start < len(df):
+        offset = ends[start - 1] if start else 0
+        stop = int(np.searchsorted(ends, offset + max_bytes, side="right"))
+        stop = max(start + 1, min(stop, start + max_rows))
+        batches.append((start, stop))
+        start = stop
+    return batches
+
+
+@lru_cache(maxsize=8)
+def _placeholders(rows: int, width: int) -> tuple[list[str], str]:
+    """Parameter names and the VALUES tuples for a batch shape; full batches all share one."""
+    names = [f"v{i}_{j}" for i in range(rows) for j in range(width)]
+    tuples = ", ".join(
+        "(" + ", ".join(f":{name}" for name in names[i * width : (i + 1) * width]) + ")"
+        for i in range(rows)
+    )
+    return names, tuples
+
+
+def build_insert(
+    table_name: str, values: list[list], columns: list[str], overwrite: bool
+) -> tuple[str, dict]:
+    """Return a parameterized INSERT for rows given as per-column value lists."""
+    names, tuples = _placeholders(len(values[0]), len(values))
+    parameters = dict(zip(names, chain.from_iterable(zip(*values))))
+    mode = "OVERWRITE" if overwrite else "INTO"
+    quoted = ", ".join(quote_identifier(c) for c in columns)
+    statement = f"INSERT {mode} {table_name} ({quoted}) VALUES {tuples}"
+    return statement, parameters
+
+
+def insert_batches(
+    table_name: str, df: pd.DataFrame, batches: list[tuple[int, int]]
+) -> Iterator[tuple[str, dict, int]]:
+    """Yield (statement, parameters, rows) replacing the table's contents with `df`.
+
+    The first of `batches` overwrites the table and the rest append to it.
+    """
+    columns = [str(c) for c in df.columns]
+    if df.empty:
+        yield f"INSERT OVERWRITE {table_name} SELECT * FROM {table_name} LIMIT 0", {}, 0
+        return
+    series = [column for _, column in df.items()]
+    for number, (start, stop) in enumerate(batches):
+        batch = [column_parameters(column.iloc[start:stop]) for column in series]
+        statement, parameters = build_insert(
+            table_name, batch, columns, overwrite=number == 0
+        )
+        yield statement, parameters, stop - start
+
+
+def overwrite_in_batches(
+    table_name: str,
+    df: pd.DataFrame,
+    conn,
+    max_rows: int = 1_000,
+    max_bytes: int = 4 * 1024**2,
+    on_batch: Callable[[int, int, int], None] | None = None,
+):
+    """Replace the contents of `table_name` with `df` in size-bounded statements.
+
+    `on_batch(batch, batches, rows_written)` is called after each statement. If a
+    later batch fails, the table is restored to the version it had before the
+    first one rather than being left half-written.
+    """
+    batches = plan_batches(df, max_rows, max_bytes)
+    version = get_table_version(table_name, conn)
+    written = 0
+    committed = 0
+    with conn.cursor() as cursor:
+        try:
+            for statement, parameters, rows in insert_batches(table_name, df, batches):
+                cursor.execute(statement, parameters)
+                committed += 1
+                written += rows
+                if on_batch is not None:
+                    on_batch(committed, max(len(batches), 1), written)
+        except Exception:
+            if committed and version is not None:
+                cursor.execute(f"RESTORE TABLE {table_name} TO VERSION AS OF {version}")
+            raise
+
+
+def write_parquet(df: pd.DataFrame, path: str, chunk_rows: int = 100_000):
+    """Write `df` to a Parquet file chunk by chunk, so only one chunk is held as Arrow."""
+    schema = pa.Schema.from_pandas(df.head(chunk_rows), preserve_index=False)
+    # Types inferred from the first chunk must also fit the values in later ones
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            values = df[field.name].dropna()
+            if len(values):
+                schema = schema.set(i, field.with_type(pa.array(values[:1]).type))
+        elif pa.types.is_decimal(field.type):
+            schema = schema.set(i, field.with_type(pa.decimal128(38, field.type.scale)))
+    # Spark reads microsecond timestamps; pandas holds nanoseconds
+    with pq.ParquetWriter(
+        path, schema, coerce_timestamps="us", allow_truncated_timestamps=True
+    ) as writer:
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start : start + chunk_rows]
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+
+
+def overwrite_from_volume(
+    table_name: str,
+    df: pd.DataFrame,
+    conn,
+    files,
+    volume_path: str,
+    on_step: Callable[[str], None] | None = None,
+):
+    """Replace the contents of `table_name` with `df` by bulk loading a staged Parquet file.
+
+    The file is uploaded with the Files API (`files`, i.e. `WorkspaceClient().files`)
+    below `volume_path` (`/Volumes/catalog/schema/volume`), loaded with
+    `read_files` in one statement, and deleted again whether or not the load worked.
+    """
+    step = on_step or (lambda message: None)
+    staged = f"{volume_path.rstrip('/')}/{STAGING_FOLDER}/{uuid.uuid4().hex}.parquet"
+    handle, local_path = tempfile.mkstemp(suffix=".parquet")
+    os.close(handle)
+    try:
+        step("Writing Parquet file...")
+        write_parquet(df, local_path)
+        step(
+            f"Uploading {os.path.getsize(local_path) / 1024**2:,.1f} MB to {staged}..."
+        )
+        with open(local_path, "rb") as f:
+            files.upload(staged, f, overwrite=True)
+        try:
+            step("Loading the staged file...")
+            columns = ", ".join(quote_identifier(str(c)) for c in df.columns)
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT OVERWRITE {table_name} ({columns}) "
+                    f"SELECT {columns} FROM read_files(:path, format => 'parquet')",
+                    {"path": staged},
+                )
+        finally:
+            files.delete(staged)
+    finally:
+        os.remove(local_path)
+
+
+def build_merge(table_name: str, changeset: Changeset) -> tuple[str, dict]:
+    """Return one MERGE statement and its parameters applying `changeset` to `table_name`.
+
+    Changed rows travel as a VALUES source tagged with an insert, update or delete
+    marker, so only the files holding those keys are rewritten. Inserted rows are only
+    ever inserted: one whose key turns out to exist is left out rather than
+    overwriting that row, so check them first with `check_new_keys`.
+    """
+    keys = changeset.keys
+    columns = list(changeset.inserted.columns)
+    values = [c for c in columns if c not in keys]
+
+    # A key deleted and inserted again, e.g. on different pages, becomes one update
+    inserted_keys = pd.MultiIndex.from_frame(changeset.inserted[keys])
+    deleted_keys = pd.MultiIndex.from_frame(changeset.deleted[keys])
+    reinserted = inserted_keys.isin(deleted_keys)
+    # Deleted rows only need their keys; the other columns are sent as NULL
+    sources = [
+        (changeset.inserted.loc[~reinserted, columns], "I"),
+        (changeset.inserted.loc[reinserted, columns], "U"),
+        (changeset.updated[columns], "U"),
+        (
+            changeset.deleted[~deleted_keys.isin(inserted_keys)].reindex(
+                columns=columns
+            ),
+            "D",
+        ),
+    ]
+    rows = [
+        (row, change)
+        for frame, change in sources
+        for row in frame.itertuples(index=False)
+    ]
+    if not rows:
+        raise ValueError("Nothing to merge")
+
+    parameters = {}
+    tuples = []
+    for i, (row, change) in enumerate(rows):
+        names = []
+        for j, value in enumerate(row):
+            parameters[f"v{i}_{j}"] = to_parameter(value)
+            names.append(f":v{i}_{j}")
+        parameters[f"c{i}"] = change
+        names.append(f":c{i}")
+        tuples.append(f"({', '.join(names)})")
+
+    quoted = [quote_identifier(c) for c in columns]
+    change = quote_identifier(CHANGE_COLUMN)
+    on = " AND ".join(
+        f"t.{quote_identifier(k)} = s.{quote_identifier(k)}" for k in keys
+    )
+    statement = (
+        f"MERGE INTO {table_name} AS t "
+        f"USING (SELECT * FROM VALUES {', '.join(tuples)} "
+        f"AS s({', '.join(quoted)}, {change})) AS s "
+        f"ON {on} "
+        f"WHEN MATCHED AND s.{change} = 'D' THEN DELETE "
+    )
+    if values:
+        assignments = ", ".join(
+            f"t.{quote_identifier(c)} = s.{quote_identifier(c)}" for c in values
+        )
+        statement += f"WHEN MATCHED AND s.{change} = 'U' THEN UPDATE SET {assignments} "
+    statement += (
+        f"WHEN NOT MATCHED AND s.{change} IN ('I', 'U') THEN "
+        f"INSERT ({', '.join(quoted)}) "
+        f"VALUES ({', '.join(f's.{c}' for c in quoted)})"
+    )
+    return statement, parameters
+
+
+def check_new_keys(table_name: str, changeset: Changeset, conn):
+    """Raise `ValueError` if rows the changeset inserts repeat keys held by the table.
+
+    Keys the changeset deletes may be reused. Only the first 10 clashes are reported.
+    """
+    keys = changeset.keys
+    inserted = changeset.inserted[keys]
+    if inserted.empty:
+        return
+    deleted = pd.MultiIndex.from_frame(changeset.deleted[keys])
+    inserted = inserted[~pd.MultiIndex.from_frame(inserted).isin(deleted)]
+    if inserted.empty:
+        return
+    names, tuples = _placeholders(len(inserted), len(keys))
+    values = [column_parameters(column) for _, column in inserted.items()]
+    parameters = dict(zip(names, chain.from_iterable(zip(*values))))
+    quoted = [quote_identifier(k) for k in keys]
+    on = " AND ".join(f"t.{k} = s.{k}" for k in quoted)
+    statement = (
+        f"SELECT {', '.join(f't.{k}' for k in quoted)} FROM {table_name} AS t "
+        f"JOIN (SELECT * FROM VALUES {tuples} AS s({', '.join(quoted)})) AS s "
+        f"ON {on} LIMIT 10"
+    )
+    with conn.cursor() as cursor:
+        cursor.execute(statement, parameters)
+        clashes = cursor.fetchall()
+    if clashes:
+        found = ", ".join(
+            str(tuple(row) if len(row) > 1 else row[0]) for row in clashes
+        )
+        raise ValueError(f"Inserted rows repeat keys the table already holds: {found}")
+
+
+def rebase_changeset(
+    table_name: str,
+    version: int | None,
+    base: pd.DataFrame,
+    changeset: Changeset,
+    conn,
+) -> Changeset:
+    """Adjust `changeset` for commits made since `version` was read.
+
+    `base` holds the rows as they were read, at least those the changeset updates.
+    Returns `changeset` itself when nothing was committed in between, and raises
+    `WriteConflict` when the commits cannot be merged with it.
+    """
+    current = get_table_version(table_name, conn)
+    if version is None or current == version:
+        return changeset
+    if not changeset.keys:
+        # Without keys any row change conflicts, but OPTIMIZE, VACUUM and the like do not
+        changes = get_data_changes(table_name, version, current, conn)
+        if not changes:
+            return changeset
+        operations = ", ".join(sorted({operation for _, operation in changes}))
+        raise WriteConflict(
+            f"The table changed since you loaded it (version {version} → {current}, "
+            f"{operations}). Reload it, or merge changed rows by key to keep the "
+            "other changes."
+        )
+    theirs = get_changes_since(table_name, version, conn)
+    if theirs is None:
+        raise WriteConflict(
+            f"The table changed since you loaded it (version {version} → {current}) "
+            "and its Change Data Feed is not available to merge with. Reload it."
+        )
+    result = three_way_merge(base, changeset, theirs)
+    if result.conflicts:
+        keys = ", ".join(str(k if len(k) > 1 else k[0]) for k in result.conflicts[:10])
+        raise WriteConflict(
+            f"{len(result.conflicts)} rows you edited were also changed by someone else "
+            f"since version {version}: {keys}. Reload the table to see their changes."
+        )
+    return result.changeset
@@ -0,0 +1,56 @@
+"""Thread-safe cache whose entries expire a fixed time after they were loaded."""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """Caches loader results for `ttl` seconds; concurrent loads of the same key run once."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._loading: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = self._loading[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            del self._loading[key]
+        future.set_result(value)
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] | None = None):
+        """Drop all entries, or only those whose key matches `predicate`."""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if predicate(k)]:
+                    del self._entries[key]
@@ -0,0 +1,81 @@
+"""On-disk records of multipart uploads in progress, so an interrupted one can resume."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass
+class UploadCheckpoint:
+    """The upload session of a file and the parts storage has confirmed so far.
+
+    `parts` maps part numbers to their ETag and the SHA-256 of the bytes sent, which
+    tells whether the local file still holds the same bytes when resuming.
+    """
+
+    path: str
+    size: int
+    part_size: int
+    session_token: str
+    created_at: float = field(default_factory=time.time)
+    parts: dict[int, tuple[str, str]] = field(default_factory=dict)
+
+
+class CheckpointStore:
+    """Keeps one JSON manifest per target path and size in `directory`.
+
+    Manifests older than `max_age` seconds are ignored and removed, since storage
+    eventually discards the parts of uploads that were never completed.
+    """
+
+    def __init__(self, directory: str, max_age: float = 24 * 3600):
+        self.directory = directory
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self, path: str, size: int, part_size: int) -> UploadCheckpoint | None:
+        file = self._file(path, size)
+        try:
+            with open(file) as f:
+                data = json.load(f)
+            checkpoint = UploadCheckpoint(
+                **{
+                    **data,
+                    "parts": {int(k): tuple(v) for k, v in data["parts"].items()},
+                }
+            )
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+        if (
+            checkpoint.path != path
+            or checkpoint.part_size != part_size
+            or time.time() - checkpoint.created_at > self.max_age
+        ):
+            self.delete(path, size)
+            return None
+        return checkpoint
+
+    def save(self, checkpoint: UploadCheckpoint):
+        with self._lock:
+            data = json.dumps(asdict(checkpoint))
+            # Write and rename, so an interruption never leaves a truncated manifest
+            handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(handle, "w") as f:
+                f.write(data)
+            os.replace(temporary, self._file(checkpoint.path, checkpoint.size))
+
+    def delete(self, path: str, size: int):
+        with self._lock:
+            try:
+                os.remove(self._file(path, size))
+            except FileNotFoundError:
+                pass
+
+    def _file(self, path: str, size: int) -> str:
+        name = hashlib.sha1(f"{path}\0{size}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
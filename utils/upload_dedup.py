@@ -0,0 +1,164 @@
+"""Skip uploading files whose content a Volume already holds."""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from databricks.sdk.errors import NotFound
+
+from utils.file_streams import HashingReader
+from utils.multipart_upload import MultipartUploader
+
+
+@dataclass
+class IndexEntry:
+    sha256: str
+    size: int
+    last_modified: str | None
+
+
+class UploadIndex:
+    """Hashes of files this app uploaded, by Volume path, kept in a local JSON file.
+
+    An entry only vouches for the remote file while its size and last-modified time
+    still match, since anyone may have replaced it since. Each change re-reads the
+    file under a lock and merges into it, so app processes sharing the index keep
+    each other's entries, and only the `max_entries` most recent uploads are kept.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[str, IndexEntry] = {}
+        self._loaded_mtime = None
+        with self._lock:
+            self._reload()
+
+    def get(self, path: str) -> IndexEntry | None:
+        with self._lock:
+            self._reload()
+            return self._entries.get(path)
+
+    def record(self, path: str, entry: IndexEntry):
+        self._update(path, entry)
+
+    def forget(self, path: str):
+        self._update(path, None)
+
+    def _update(self, path: str, entry: IndexEntry | None):
+        with self._lock, _locked(f"{self.path}.lock"):
+            self._reload()
+            if entry is None and path not in self._entries:
+                return
+            # Re-inserting keeps the entries ordered from oldest to newest upload
+            self._entries.pop(path, None)
+            if entry is not None:
+                self._entries[path] = entry
+            excess = len(self._entries) - self.max_entries
+            for oldest in list(self._entries)[: max(excess, 0)]:
+                del self._entries[oldest]
+            data = {k: asdict(v) for k, v in self._entries.items()}
+            # Write and rename, so a crash never leaves a truncated index behind
+            directory = os.path.dirname(os.path.abspath(self.path))
+            handle, temporary = tempfile.mkstemp(dir=directory, suffix=".json")
+            with os.fdopen(handle, "w") as f:
+                json.dump(data, f)
+            os.replace(temporary, self.path)
+            self._loaded_mtime = os.stat(self.path).st_mtime_ns
+
+    def _reload(self):
+        """Pick up the index file again if another process replaced it."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            with open(self.path) as f:
+                self._entries = {k: IndexEntry(**v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            self._entries = {}
+        self._loaded_mtime = mtime
+
+
+@contextmanager
+def _locked(path: str):
+    """Hold an exclusive lock on `path` across processes, where the OS supports it."""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+class DedupUploader:
+    """Uploads through `uploader` unless the file at the target path already has this content.
+
+    The remote size and last-modified time come from `files.get_metadata`. When they
+    match what `index` recorded for the last upload, the local file is hashed and
+    compared with the recorded SHA-256, and the upload is skipped if they agree.
+    Otherwise the file is hashed as it streams out and recorded afterwards.
+    """
+
+    def __init__(self, uploader: MultipartUploader, files, index: UploadIndex):
+        self.uploader = uploader
+        self.files = files
+        self.index = index
+
+    def upload(
+        self,
+        path: str,
+        f: BinaryIO,
+        overwrite: bool = True,
+        on_progress: Callable[[int, int], None] | None = None,
+        size: int | None = None,
+    ) -> int:
+        """Upload like `MultipartUploader.upload`; returns 0 parts when skipped."""
+        reader = HashingReader(f)
+        if size is None:
+            size = reader.seek(0, os.SEEK_END)
+            reader.seek(0)
+        if self._unchanged(path, reader, size):
+            if on_progress is not None:
+                on_progress(size, size)
+            return 0
+        parts = self.uploader.upload(
+            path, reader, overwrite=overwrite, on_progress=on_progress, size=size
+        )
+        sha256 = reader.hexdigest()
+        metadata = self._metadata(path)
+        if metadata is not None:
+            self.index.record(path, IndexEntry(sha256, size, metadata.last_modified))
+        return parts
+
+    def _unchanged(self, path: str, reader: HashingReader, size: int) -> bool:
+        entry = self.index.get(path)
+        if entry is None or entry.size != size:
+            return False
+        metadata = self._metadata(path)
+        if (
+            metadata is None
+            or metadata.content_length != size
+            or metadata.last_modified != entry.last_modified
+        ):
+            self.index.forget(path)
+            return False
+        matches = reader.hexdigest() == entry.sha256
+        reader.seek(0)
+        return matches
+
+    def _metadata(self, path: str):
+        try:
+            return self.files.get_metadata(path)
+        except NotFound:
+            return None
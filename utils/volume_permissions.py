@@ -0,0 +1,136 @@
+"""Check whether the app can write to a Unity Catalog Volume, with cached and concurrent lookups."""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Hashable
+
+from databricks.sdk import WorkspaceClient
+from databricks.sdk.service.catalog import SecurableType
+
+from utils.ttl_cache import TTLCache
+
+# What each level of the Volume's path needs, besides ALL_PRIVILEGES which covers all
+REQUIRED_PRIVILEGES = {
+    SecurableType.CATALOG: "USE_CATALOG",
+    SecurableType.SCHEMA: "USE_SCHEMA",
+    SecurableType.VOLUME: "WRITE_VOLUME",
+}
+
+
+@dataclass
+class PermissionCheck:
+    allowed: bool
+    message: str
+    missing: list[str]
+
+
+class VolumePermissions:
+    """Checks write access to Volumes for the identity of `w`, or of other clients.
+
+    `current_user.me()` is cached for `identity_ttl` seconds per identity, and the
+    effective privileges of a principal on a securable for `ttl` seconds, so repeated
+    checks by many users cost no calls at all. The lookups of a check that are not
+    cached yet run concurrently: the Volume itself and the effective privileges on
+    it, its schema and its catalog, which include those inherited from above.
+    """
+
+    def __init__(
+        self,
+        w: WorkspaceClient,
+        ttl: float = 60,
+        identity_ttl: float = 3600,
+        max_workers: int = 8,
+    ):
+        self._w = w
+        self._identities = TTLCache(identity_ttl)
+        self._cache = TTLCache(ttl)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="permission-check"
+        )
+
+    def principal(
+        self, w: WorkspaceClient | None = None, identity: Hashable = None
+    ) -> str:
+        """The user or service principal name of `w`, cached under `identity`."""
+        w = w or self._w
+        return self._identities.get_or_load(
+            identity, lambda: w.current_user.me().user_name
+        )
+
+    def privileges(
+        self, principal: str, securable_type: SecurableType, full_name: str
+    ) -> frozenset[str]:
+        """The privileges `principal` holds on a securable, directly or inherited."""
+
+        def load():
+            grants = self._w.grants.get_effective(
+                securable_type=securable_type, full_name=full_name, principal=principal
+            )
+            return frozenset(
+                p.privilege.value
+                for assignment in grants.privilege_assignments or []
+                for p in assignment.privileges or []
+                if p.privilege is not None
+            )
+
+        return self._cache.get_or_load(
+            ("privileges", principal, securable_type.value, full_name), load
+        )
+
+    def volume(self, volume_name: str):
+        return self._cache.get_or_load(
+            ("volume", volume_name), lambda: self._w.volumes.read(name=volume_name)
+        )
+
+    def check_write(
+        self,
+        volume_name: str,
+        w: WorkspaceClient | None = None,
+        identity: Hashable = None,
+    ) -> PermissionCheck:
+        """Check that the identity can write files to the Volume `catalog.schema.volume`.
+
+        A failed check is not remembered, so granting the missing privileges and
+        checking again takes effect straight away.
+        """
+        parts = volume_name.split(".")
+        if len(parts) != 3 or not all(parts):
+            return PermissionCheck(
+                False, "Specify the Volume as catalog.schema.volume.", []
+            )
+        principal = self.principal(w, identity)
+        securables = {
+            SecurableType.CATALOG: parts[0],
+            SecurableType.SCHEMA: ".".join(parts[:2]),
+            SecurableType.VOLUME: volume_name,
+        }
+        volume = self._executor.submit(self.volume, volume_name)
+        lookups = {
+            securable_type: self._executor.submit(
+                self.privileges, principal, securable_type, full_name
+            )
+            for securable_type, full_name in securables.items()
+        }
+        volume.result()
+        missing = [
+            f"{required.replace('_', ' ')} on {securables[securable_type]}"
+            for securable_type, required in REQUIRED_PRIVILEGES.items()
+            if not {required, "ALL_PRIVILEGES"} & lookups[securable_type].result()
+        ]
+        if missing:
+            self.invalidate(volume_name)
+            return PermissionCheck(
+                False,
+                f"Insufficient permissions for {principal}: missing {', '.join(missing)}.",
+                missing,
+            )
+        return PermissionCheck(True, "Volume and permissions validated", [])
+
+    def invalidate(self, volume_name: str | None = None):
+        """Forget cached privileges, for everything or for one Volume and its parents."""
+        if volume_name is None:
+            self._cache.invalidate()
+            return
+        parts = volume_name.split(".")
+        names = {parts[0], ".".join(parts[:2]), volume_name}
+        self._cache.invalidate(lambda key: key[-1] in names)
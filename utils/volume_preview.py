@@ -0,0 +1,271 @@
+"""Preview the start of a Volume file by reading only the bytes it needs."""
+
+import bisect
+import io
+import json
+import posixpath
+from dataclasses import dataclass
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.multipart_upload import FILES_API
+
+BLOCK_SIZE = 256 * 1024
+PREVIEW_BYTES = 1024**2
+MAX_STREAM_BYTES = 64 * 1024**2
+PREFETCH_CHUNK_BYTES = 1024**2
+
+TEXT_SEPARATORS = {".csv": ",", ".tsv": "\t"}
+JSON_SUFFIXES = {".json", ".jsonl", ".ndjson"}
+
+
+class RangeNotSupported(Exception):
+    """The Files API answered a ranged read with the whole file."""
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable read-only view of a Volume file that downloads only the ranges read.
+
+    A read fetches the part it is missing with one `Range` request of at least
+    `block_size` bytes, stopping short of ranges already fetched. Every range is
+    kept, so no byte is transferred twice and the many small reads of a Parquet
+    reader cost few requests. `bytes_fetched` and `requests` count what was
+    transferred.
+    """
+
+    def __init__(self, w, path: str, size: int, block_size: int = BLOCK_SIZE):
+        self._api = w.api_client
+        self.path = path
+        self.size = size
+        self.block_size = block_size
+        self.bytes_fetched = 0
+        self.requests = 0
+        self._position = 0
+        self._starts: list[int] = []
+        self._ranges: dict[int, bytes] = {}
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = min(max(offset, 0), self.size)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        count = min(len(view), self.size - self._position)
+        copied = 0
+        while copied < count:
+            position = self._position + copied
+            data, offset = self._cached(position)
+            if data is None:
+                data, offset = self._fetch_gap(position, count - copied), 0
+                if not data:
+                    break
+            length = min(count - copied, len(data) - offset)
+            view[copied : copied + length] = data[offset : offset + length]
+            copied += length
+        self._position += copied
+        return copied
+
+    def prefetch(self, ranges: list[tuple[int, int]]):
+        """Fetch `(start, length)` ranges before they are read, merging neighbours."""
+        merged: list[list[int]] = []
+        for start, length in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], start + length)
+            else:
+                merged.append([start, start + length])
+        for start, end in merged:
+            position = start
+            while position < min(end, self.size):
+                data, offset = self._cached(position)
+                if data is None:
+                    data, offset = self._fetch_gap(position, end - position), 0
+                    if not data:
+                        break
+                position += len(data) - offset
+
+    def _cached(self, position: int) -> tuple[bytes | None, int]:
+        """The kept range holding `position` and the offset into it, if any."""
+        i = bisect.bisect_right(self._starts, position) - 1
+        if i >= 0:
+            start = self._starts[i]
+            data = self._ranges[start]
+            if position < start + len(data):
+                return data, position - start
+        return None, 0
+
+    def _fetch_gap(self, position: int, count: int) -> bytes:
+        """Fetch from `position` up to the next kept range, `block_size` at least."""
+        i = bisect.bisect_right(self._starts, position)
+        limit = self._starts[i] if i < len(self._starts) else self.size
+        data = self.fetch(position, min(max(count, self.block_size), limit - position))
+        if data:
+            self._starts.insert(i, position)
+            self._ranges[position] = data
+        return data
+
+    def fetch(self, start: int, length: int) -> bytes:
+        """Download `length` bytes from `start`, or fewer at the end of the file."""
+        end = min(start + length, self.size) - 1
+        if end < start:
+            return b""
+        response = self._api.do(
+            "GET",
+            f"{FILES_API}/files{quote(self.path)}",
+            headers={
+                "Accept": "application/octet-stream",
+                "Range": f"bytes={start}-{end}",
+            },
+            response_headers=["content-range"],
+            raw=True,
+        )
+        contents = response["contents"]
+        try:
+            # Without a Content-Range the body is the whole file, which only helps from 0
+            if not response.get("content-range") and start > 0:
+                raise RangeNotSupported(self.path)
+            data = contents.read(end - start + 1)
+        finally:
+            contents.close()
+        self.requests += 1
+        self.bytes_fetched += len(data)
+        return data
+
+
+@dataclass
+class Preview:
+    data: pd.DataFrame
+    format: str
+    size: int
+    bytes_fetched: int
+    requests: int
+    note: str | None = None
+
+
+def preview_file(
+    w,
+    path: str,
+    rows: int = 100,
+    max_bytes: int = PREVIEW_BYTES,
+    max_columns: int = 50,
+    max_stream_bytes: int = MAX_STREAM_BYTES,
+) -> Preview:
+    """The first `rows` rows of the Volume file at `path`, as a table.
+
+    Parquet files are read through their footer: only the first row group's pages
+    for the first `max_columns` columns are fetched, with ranged reads. Where ranges
+    are not supported, files up to `max_stream_bytes` are streamed instead.
+    Other files are read from their first `max_bytes` bytes: CSV and TSV by column,
+    JSON Lines by record, and anything else as lines of text.
+    """
+    size = w.files.get_metadata(path).content_length
+    reader = RangeReader(w, path, size)
+    suffix = posixpath.splitext(path)[1].lower()
+    if suffix == ".parquet":
+        try:
+            data, note = _read_parquet(reader, rows, max_columns)
+        except RangeNotSupported:
+            if size > max_stream_bytes:
+                raise ValueError(
+                    f"The Volume does not support ranged reads, and the file is "
+                    f"larger than the {max_stream_bytes / 1024**2:,.0f} MB that can "
+                    f"be previewed without them."
+                ) from None
+            with w.files.download(path).contents as contents:
+                source = io.BytesIO(contents.read())
+            data, note = _read_parquet(source, rows, max_columns)
+            return Preview(data, "parquet", size, size, 1, note)
+        return _preview(data, "parquet", reader, note)
+
+    head = reader.fetch(0, max_bytes)
+    complete = len(head) >= size
+    if not complete:
+        # Drop the line cut off at the end of the range
+        head = head[: head.rfind(b"\n") + 1]
+    try:
+        if suffix in TEXT_SEPARATORS:
+            data = pd.read_csv(
+                io.BytesIO(head), sep=TEXT_SEPARATORS[suffix], nrows=rows
+            )
+            return _preview(data, "csv", reader)
+        if suffix in JSON_SUFFIXES:
+            return _preview(_read_json(head, rows, complete), "json", reader)
+    except ValueError as e:
+        note = f"Could not parse the file as {suffix[1:].upper()}, showing text: {e}"
+    else:
+        note = None
+    lines = head.decode("utf-8", errors="replace").splitlines()[:rows]
+    return _preview(pd.DataFrame({"line": lines}), "text", reader, note)
+
+
+def _read_parquet(source, rows: int, max_columns: int) -> tuple[pd.DataFrame, str]:
+    # Buffered reads go page by page, fetching the start of each column chunk only
+    parquet = pq.ParquetFile(source, buffer_size=BLOCK_SIZE, pre_buffer=False)
+    schema = parquet.schema_arrow
+    columns = schema.names[:max_columns]
+    metadata = parquet.metadata
+    if isinstance(source, RangeReader) and metadata.num_row_groups:
+        source.prefetch(_small_chunks(metadata.row_group(0), columns))
+    batch = next(parquet.iter_batches(batch_size=rows, columns=columns), None)
+    if batch is None:
+        batch = schema.empty_table().select(columns)
+    note = f"{metadata.num_rows:,} rows in {metadata.num_row_groups:,} row groups"
+    if len(columns) < len(schema.names):
+        note += f", showing {len(columns)} of {len(schema.names)} columns"
+    return batch.to_pandas(), note
+
+
+def _small_chunks(group, columns: list[str]) -> list[tuple[int, int]]:
+    # A chunk this small is usually a single page, all of which the first rows need
+    ranges = []
+    for i in range(group.num_columns):
+        chunk = group.column(i)
+        if chunk.path_in_schema.split(".")[0] not in columns:
+            continue
+        if chunk.total_compressed_size > PREFETCH_CHUNK_BYTES:
+            continue
+        start = chunk.data_page_offset
+        if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+            start = min(start, chunk.dictionary_page_offset)
+        ranges.append((start, chunk.total_compressed_size))
+    return ranges
+
+
+def _read_json(head: bytes, rows: int, complete: bool) -> pd.DataFrame:
+    # A single JSON document can only be parsed when it was read whole
+    if complete:
+        try:
+            document = json.loads(head)
+        except ValueError:
+            pass
+        else:
+            records = (document if isinstance(document, list) else [document])[:rows]
+            if all(isinstance(record, dict) for record in records):
+                return pd.json_normalize(records)
+            return pd.DataFrame({"value": records})
+    return pd.read_json(io.BytesIO(head), lines=True, nrows=rows)
+
+
+def _preview(
+    data: pd.DataFrame,
+    format: str,
+    reader: RangeReader,
+    note: str | None = None,
+) -> Preview:
+    return Preview(
+        data, format, reader.size, reader.bytes_fetched, reader.requests, note
+    )
@@ -0,0 +1,153 @@
+"""Bounded queue running table writes on background threads, one write per table at a time."""
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable
+
+from utils.sql_pool import BROKEN_CONNECTION_ERRORS
+
+QUEUED = "queued"
+RUNNING = "running"
+COMMITTED = "committed"
+FAILED = "failed"
+
+# Worth retrying on a fresh connection; anything else fails the job straight away
+TRANSIENT_ERRORS = (*BROKEN_CONNECTION_ERRORS, TimeoutError)
+
+# A step writes to the warehouse and may report (fraction done or None, message)
+Report = Callable[[float | None, str], None]
+Step = Callable[[Report], None]
+
+
+@dataclass
+class WriteJob:
+    table_name: str
+    description: str
+    step: Step = field(repr=False)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    state: str = QUEUED
+    progress: float | None = None
+    message: str = ""
+    attempts: int = 0
+    error: str | None = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in (COMMITTED, FAILED)
+
+
+class WriteQueue:
+    """Runs submitted writes on `workers` threads so saving does not block the page.
+
+    Writes to the same table run in the order they were submitted and never
+    concurrently. Each write is a job of its own, so whoever submitted it sees its
+    outcome only. A write failing with a transient error is retried up to
+    `max_attempts` times with exponential backoff. At most `max_queued` jobs wait at
+    once, and the last `history` finished jobs are kept for reporting.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queued: int = 32,
+        max_attempts: int = 4,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        history: int = 100,
+    ):
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.history = history
+        self._queued: list[WriteJob] = []
+        self._running: set[str] = set()
+        self._jobs: OrderedDict[str, WriteJob] = OrderedDict()
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"table-writer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, table_name: str, step: Step, description: str) -> WriteJob:
+        """Queue `step` as a write to `table_name` and return the job that will run it.
+
+        Raises `queue.Full` when `max_queued` jobs are already waiting.
+        """
+        with self._cond:
+            if len(self._queued) >= self.max_queued:
+                raise queue.Full(f"{len(self._queued)} writes are already queued")
+            job = WriteJob(table_name, description, step)
+            self._queued.append(job)
+            self._jobs[job.id] = job
+            self._prune()
+            self._cond.notify()
+            return job
+
+    def job(self, job_id: str) -> WriteJob | None:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def _next(self) -> WriteJob:
+        with self._cond:
+            while True:
+                for job in self._queued:
+                    if job.table_name not in self._running:
+                        self._queued.remove(job)
+                        self._running.add(job.table_name)
+                        job.state = RUNNING
+                        return job
+                self._cond.wait()
+
+    def _work(self):
+        while True:
+            job = self._next()
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._running.discard(job.table_name)
+                    self._cond.notify_all()
+
+    def _run(self, job: WriteJob):
+        def report(progress: float | None, message: str):
+            job.progress, job.message = progress, message
+
+        while True:
+            job.attempts += 1
+            try:
+                job.step(report)
+            except TRANSIENT_ERRORS as e:
+                if job.attempts >= self.max_attempts:
+                    self._finish(job, FAILED, e)
+                    return
+                delay = min(self.max_backoff, self.backoff * 2 ** (job.attempts - 1))
+                report(None, f"Retrying in {delay:.0f} s after: {e}")
+                time.sleep(delay)
+            except Exception as e:
+                self._finish(job, FAILED, e)
+                return
+            else:
+                self._finish(job, COMMITTED)
+                return
+
+    def _finish(self, job: WriteJob, state: str, error: Exception | None = None):
+        with self._cond:
+            job.state = state
+            job.error = str(error) if error is not None else None
+            job.progress = 1.0 if state == COMMITTED else job.progress
+            job.finished_at = time.time()
+            self._prune()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
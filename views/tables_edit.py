@@ -1,22 +1,50 @@
+import os
+import queue
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import streamlit as st
 from databricks import sql
+from databricks.sdk import WorkspaceClient
 from databricks.sdk.core import Config
+from utils.catalog_browser import CatalogBrowser
+from utils.query_builder import quote_identifier, split_identifier
+from utils.sql_pool import ConnectionPool
+from utils.table_diff import Changeset, TableDiff
+from utils.table_metadata import get_primary_key, get_table_version
+from utils.table_pages import TablePages
+from utils.table_writer import (
+    build_merge,
+    check_new_keys,
+    overwrite_from_volume,
+    overwrite_in_batches,
+    rebase_changeset,
+)
+from utils.write_queue import COMMITTED, QUEUED, RUNNING, Report, Step, WriteQueue
 
 
 st.header(body="Tables", divider=True)
 st.subheader("Edit a table")
 st.write(
-    "Use this recipe to read, edit, and write back data stored in a small Unity Catalog table "
+    "Use this recipe to read, edit, and write back data stored in a Unity Catalog table "
     "with [Databricks SQL Connector]"
-    "(https://docs.databricks.com/en/dev-tools/python-sql-connector.html)."
+    "(https://docs.databricks.com/en/dev-tools/python-sql-connector.html). "
+    "Small tables are edited whole; larger ones page by page in key order, "
+    "with only the changed rows merged back."
 )
 
 cfg = Config()
 
+SQL_POOL_SIZE = int(os.getenv("SQL_POOL_SIZE", "8"))
+WRITE_BATCH_ROWS = int(os.getenv("WRITE_BATCH_ROWS", "1000"))
+WRITE_BATCH_MB = float(os.getenv("WRITE_BATCH_MB", "4"))
+STAGING_VOLUME = os.getenv("STAGING_VOLUME", "")
+EDIT_PAGE_ROWS = int(os.getenv("EDIT_PAGE_ROWS", "1000"))
+WRITE_QUEUE_WORKERS = int(os.getenv("WRITE_QUEUE_WORKERS", "2"))
+WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", "32"))
 
-@st.cache_resource
-def get_connection(http_path):
+
+def connect(http_path):
     return sql.connect(
         server_hostname=cfg.host,
         http_path=http_path,
@@ -24,22 +52,356 @@ def get_connection(http_path):
     )
 
 
-def read_table(table_name: str, conn) -> pd.DataFrame:
+@st.cache_resource
+def get_connection_pool(http_path) -> ConnectionPool:
+    return ConnectionPool(lambda: connect(http_path), max_size=SQL_POOL_SIZE)
+
+
+def read_table(table_name: str, conn, version: int | None = None) -> pd.DataFrame:
     with conn.cursor() as cursor:
-        cursor.execute(f"SELECT * FROM {table_name}")
+        if version is None:
+            cursor.execute(f"SELECT * FROM {table_name}")
+        else:
+            cursor.execute(f"SELECT * FROM {table_name} VERSION AS OF {int(version)}")
         return cursor.fetchall_arrow().to_pandas()
 
 
-def insert_overwrite_table(table_name: str, df: pd.DataFrame, conn):
-    progress = st.empty()
-    with conn.cursor() as cursor:
-        rows = list(df.itertuples(index=False))
-        values = ",".join([f"({','.join(map(repr, row))})" for row in rows])
-        with progress:
-            st.info("Calling Databricks SQL...")
-        cursor.execute(f"INSERT OVERWRITE {table_name} VALUES {values}")
-    progress.empty()
-    st.success("Changes saved")
+def load_table(http_path: str, table_name: str) -> dict:
+    """Read the table once per session, pinned to the Delta version it was read at."""
+    loaded = st.session_state.get("loaded_table")
+    if loaded is None or loaded["source"] != (http_path, table_name):
+        with get_connection_pool(http_path).connection() as conn:
+            version = get_table_version(table_name, conn)
+            original_df = read_table(table_name, conn, version)
+        # A fresh editor key drops edits made against an earlier read
+        loaded = {
+            "source": (http_path, table_name),
+            "version": version,
+            "diff": TableDiff(original_df),
+            "editor_key": f"editor-{uuid.uuid4().hex}",
+        }
+        st.session_state["loaded_table"] = loaded
+    return loaded
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_table_columns(http_path: str, table_name: str) -> list[str]:
+    with get_connection_pool(http_path).connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM IDENTIFIER(:table_name) LIMIT 0",
+                {"table_name": table_name},
+            )
+            return cursor.fetchall_arrow().column_names
+
+
+@st.cache_resource
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="page-prefetch")
+
+
+def load_pages(http_path: str, table_name: str, keys: list[str]) -> TablePages:
+    """Open the table for editing one window at a time, pinned to its current version."""
+    pages = st.session_state.get("paged_table")
+    source = (http_path, table_name, tuple(keys))
+    if pages is None or pages.source != source:
+        if pages is not None:
+            pages.close()
+        pool = get_connection_pool(http_path)
+
+        def fetch(statement, parameters):
+            with pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(statement, parameters)
+                    return cursor.fetchall_arrow().to_pandas()
+
+        with pool.connection() as conn:
+            version = get_table_version(table_name, conn)
+        pages = TablePages(
+            table_name,
+            keys,
+            fetch,
+            page_size=EDIT_PAGE_ROWS,
+            version=version,
+            executor=get_prefetch_executor(),
+        )
+        pages.source = source
+        st.session_state["paged_table"] = pages
+    return pages
+
+
+def report_batches(report: Report):
+    def on_batch(batch, batches, rows):
+        report(batch / batches, f"Wrote batch {batch} of {batches} ({rows:,} rows)")
+
+    return on_batch
+
+
+def save_step(
+    pool: ConnectionPool,
+    table_name: str,
+    version: int | None,
+    base: pd.DataFrame,
+    changeset: Changeset,
+    edited_df: pd.DataFrame,
+    staging_volume: str | None,
+) -> Step:
+    """Return the write to run in the background; it must not call Streamlit."""
+    files = get_workspace_client().files if staging_volume else None
+    rebased = None
+
+    def run(report: Report):
+        nonlocal rebased
+        with pool.connection() as conn:
+            # Check once: a retry must not mistake a restored partial write, or rows
+            # inserted by a MERGE that committed before its connection dropped, for
+            # a conflict
+            if rebased is None:
+                report(None, "Checking for concurrent changes...")
+                checked = rebase_changeset(table_name, version, base, changeset, conn)
+                if checked.keys:
+                    check_new_keys(table_name, checked, conn)
+                rebased = checked
+            if rebased.keys:
+                report(None, f"Merging {rebased.summary()}...")
+                statement, parameters = build_merge(table_name, rebased)
+                with conn.cursor() as cursor:
+                    cursor.execute(statement, parameters)
+            elif staging_volume:
+                catalog, schema, volume = split_identifier(staging_volume)
+                overwrite_from_volume(
+                    table_name,
+                    edited_df,
+                    conn,
+                    files,
+                    f"/Volumes/{catalog}/{schema}/{volume}",
+                    on_step=lambda message: report(None, message),
+                )
+            else:
+                overwrite_in_batches(
+                    table_name,
+                    edited_df,
+                    conn,
+                    max_rows=WRITE_BATCH_ROWS,
+                    max_bytes=int(WRITE_BATCH_MB * 1024**2),
+                    on_batch=report_batches(report),
+                )
+
+    return run
+
+
+def submit_save(table_name: str, step: Step, changeset: Changeset, state_key: str):
+    """Queue the write and remember which edits it saves, so they can be reloaded once it commits."""
+    try:
+        job = get_write_queue().submit(table_name, step, changeset.summary())
+    except queue.Full:
+        st.warning("Too many saves are waiting to run. Try again shortly.", icon="⚠️")
+        return
+    jobs = st.session_state.setdefault("write_jobs", [])
+    if job.id not in jobs:
+        jobs.append(job.id)
+    st.session_state["saving"] = (job.id, state_key, pending_edits(state_key))
+    # Render Save disabled until this write finishes, so it cannot be submitted twice
+    st.rerun()
+
+
+def pending_edits(state_key: str):
+    """Fingerprint of the unsaved edits held under `state_key`."""
+    if state_key == "paged_table":
+        pages = st.session_state.get("paged_table")
+        return pages.changeset().summary() if pages is not None else None
+    loaded = st.session_state.get("loaded_table")
+    return repr(st.session_state.get(loaded["editor_key"])) if loaded else None
+
+
+def show_write_jobs():
+    write_queue = get_write_queue()
+    saving = st.session_state.get("saving")
+    if saving is not None:
+        job_id, state_key, edits = saving
+        job = write_queue.job(job_id)
+        if job is None or job.done:
+            del st.session_state["saving"]
+            # Show the saved table unless it was edited further in the meantime
+            if job is not None and job.state == COMMITTED:
+                if pending_edits(state_key) == edits:
+                    st.session_state.pop(state_key, None)
+            # Enable saving again
+            st.rerun(scope="app")
+
+    job_ids = st.session_state.get("write_jobs", [])
+    for job in filter(None, map(write_queue.job, reversed(job_ids[-5:]))):
+        label = f"{job.table_name}: {job.description}"
+        if job.state == QUEUED:
+            st.info(f"Waiting to save {label}", icon=":material/schedule:")
+        elif job.state == RUNNING:
+            attempt = f" (attempt {job.attempts})" if job.attempts > 1 else ""
+            st.progress(
+                job.progress or 0.0,
+                text=f"Saving {label}{attempt}. {job.message}",
+            )
+        elif job.state == COMMITTED:
+            st.success(f"Saved {label}", icon=":material/check:")
+        else:
+            st.error(f"Could not save {label}. {job.error}", icon="🚨")
+
+
+def edit_in_pages(http_path: str, table_name: str, keys: list[str]):
+    pages = load_pages(http_path, table_name, keys)
+    number = pages.current
+    edited_df = st.data_editor(
+        pages.view(), num_rows="dynamic", hide_index=True, key=pages.editor_key
+    )
+    try:
+        pages.record(number, edited_df)
+    except ValueError as e:
+        st.error(f"Cannot keep the changes to this page: {e}", icon="🚨")
+
+    col_previous, col_next, col_rows = st.columns([2, 2, 5])
+    col_previous.button(
+        "Previous",
+        icon=":material/chevron_left:",
+        disabled=number == 0,
+        on_click=pages.go,
+        args=(number - 1,),
+    )
+    col_next.button(
+        "Next",
+        icon=":material/chevron_right:",
+        disabled=pages.is_last(number),
+        on_click=pages.go,
+        args=(number + 1,),
+    )
+    first_row = number * pages.page_size
+    col_rows.caption(
+        f"Rows {first_row + 1:,}–{first_row + len(pages.page(number)):,} "
+        f"in order of {', '.join(keys)}"
+    )
+
+    changeset = pages.changeset()
+    if not changeset.empty:
+        st.caption(
+            f"Pending changes: {changeset.summary()} "
+            f"across {pages.edited_pages} page{'s' if pages.edited_pages > 1 else ''}"
+        )
+        if st.button("Save changes", disabled="saving" in st.session_state):
+            step = save_step(
+                get_connection_pool(http_path),
+                table_name,
+                pages.version,
+                pages.originals(),
+                changeset,
+                None,
+                None,
+            )
+            submit_save(table_name, step, changeset, "paged_table")
+
+
+def edit_whole_table(
+    http_path: str,
+    table_name: str,
+    write_mode: str,
+    key_columns: list[str],
+    staging_volume: str | None,
+):
+    loaded = load_table(http_path, table_name)
+    table_diff, editor_key = loaded["diff"], loaded["editor_key"]
+    original_df = table_diff.original
+
+    edited_df = st.data_editor(
+        original_df, num_rows="dynamic", hide_index=True, key=editor_key
+    )
+    st.button(
+        "Reload table",
+        on_click=st.session_state.pop,
+        args=("loaded_table", None),
+    )
+
+    if write_mode == "Merging changed rows" and not key_columns:
+        st.warning("Choose the key columns to merge changes on.", icon="⚠️")
+    elif staging_volume is not None and len(split_identifier(staging_volume)) != 3:
+        st.warning("Specify the staging Volume as catalog.schema.volume.", icon="⚠️")
+    else:
+        try:
+            changeset = table_diff.compare(
+                edited_df, key_columns, st.session_state.get(editor_key)
+            )
+        except ValueError as e:
+            st.error(f"Cannot save changes: {e}", icon="🚨")
+        else:
+            if not changeset.empty:
+                st.caption(f"Pending changes: {changeset.summary()}")
+                if st.button("Save changes", disabled="saving" in st.session_state):
+                    step = save_step(
+                        get_connection_pool(http_path),
+                        table_name,
+                        loaded["version"],
+                        original_df,
+                        changeset,
+                        edited_df,
+                        staging_volume,
+                    )
+                    submit_save(table_name, step, changeset, "loaded_table")
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def detect_primary_key(http_path: str, table_name: str) -> list[str]:
+    with get_connection_pool(http_path).connection() as conn:
+        return get_primary_key(table_name, conn)
+
+
+@st.cache_resource
+def get_workspace_client() -> WorkspaceClient:
+    return WorkspaceClient()
+
+
+@st.cache_resource
+def get_write_queue() -> WriteQueue:
+    return WriteQueue(workers=WRITE_QUEUE_WORKERS, max_queued=WRITE_QUEUE_SIZE)
+
+
+@st.cache_resource
+def get_catalog_browser() -> CatalogBrowser:
+    return CatalogBrowser(get_workspace_client())
+
+
+def select_table(browser: CatalogBrowser) -> str | None:
+    col_catalog, col_schema, col_table, col_refresh = st.columns([4, 4, 4, 1])
+    try:
+        with col_catalog:
+            catalog = st.selectbox(
+                "Catalog:", browser.catalogs(), index=None, placeholder="Select"
+            )
+        with col_schema:
+            schema = st.selectbox(
+                "Schema:",
+                browser.schemas(catalog) if catalog else [],
+                index=None,
+                placeholder="Select",
+                disabled=not catalog,
+            )
+        with col_table:
+            table = st.selectbox(
+                "Table:",
+                browser.tables(catalog, schema) if schema else [],
+                index=None,
+                placeholder="Select",
+                disabled=not schema,
+            )
+    except Exception as e:
+        st.error(f"Error listing Unity Catalog objects: {e}", icon="🚨")
+        return None
+    with col_refresh:
+        st.button(
+            "",
+            icon=":material/refresh:",
+            help="Reload the catalog listings",
+            on_click=browser.refresh,
+            args=(catalog,),
+        )
+    if catalog and schema and table:
+        return ".".join(quote_identifier(part) for part in (catalog, schema, table))
+    return None
 
 
 tab_a, tab_b, tab_c = st.tabs(["**Try it**", "**Code snippet**", "**Requirements**"])
@@ -50,29 +412,81 @@ with tab_a:
         placeholder="/sql/1.0/warehouses/xxxxxx",
     )
 
-    table_name = st.text_input(
-        "Specify a Catalog table name:", placeholder="catalog.schema.table"
+    table_source = st.radio(
+        "Choose a table:", ["Browse Unity Catalog", "Enter a name"], horizontal=True
     )
+    if table_source == "Browse Unity Catalog":
+        table_name = select_table(get_catalog_browser())
+    else:
+        table_name = st.text_input(
+            "Specify a Catalog table name:", placeholder="catalog.schema.table"
+        )
 
     if http_path_input and table_name:
-        conn = get_connection(http_path_input)
-        original_df = read_table(table_name, conn)
-        edited_df = st.data_editor(original_df, num_rows="dynamic", hide_index=True)
-
-        df_diff = pd.concat([original_df, edited_df]).drop_duplicates(keep=False)
-        if not df_diff.empty:
-            if st.button("Save changes"):
-                insert_overwrite_table(table_name, edited_df, conn)
+        write_mode = st.radio(
+            "Write changes back by:",
+            [
+                "Merging changed rows",
+                "Overwriting the table",
+                "Bulk loading through a Volume",
+            ],
+            horizontal=True,
+            help="Merging rewrites only the files holding edited rows and needs a key. "
+            "Bulk loading stages the table as Parquet in a Volume and suits large tables.",
+        )
+        key_columns = []
+        staging_volume = None
+        paged = False
+        if write_mode == "Bulk loading through a Volume":
+            staging_volume = st.text_input(
+                "Staging Volume:",
+                value=STAGING_VOLUME,
+                placeholder="catalog.schema.volume",
+                help="The Parquet file is written here and deleted after loading",
+            )
+        elif write_mode == "Merging changed rows":
+            key_columns = st.multiselect(
+                "Key columns:",
+                get_table_columns(http_path_input, table_name),
+                default=detect_primary_key(http_path_input, table_name),
+                help="Columns that identify a row. Defaults to the table's primary key.",
+            )
+            paged = st.toggle(
+                "Edit page by page",
+                disabled=not key_columns,
+                help=f"Read {EDIT_PAGE_ROWS:,} rows at a time in key order, "
+                "for tables too large to load at once",
+            )
+
+        if paged and key_columns:
+            edit_in_pages(http_path_input, table_name, key_columns)
+        else:
+            edit_whole_table(
+                http_path_input, table_name, write_mode, key_columns, staging_volume
+            )
     else:
         st.warning("Provide both the warehouse path and a table name to load data.")
 
+    if st.session_state.get("write_jobs"):
+        # Poll only while a save is outstanding; edits stay possible meanwhile
+        write_queue = get_write_queue()
+        outstanding = "saving" in st.session_state or any(
+            not job.done
+            for job in map(write_queue.job, st.session_state["write_jobs"])
+            if job is not None
+        )
+        st.fragment(show_write_jobs, run_every=1 if outstanding else None)()
+
 
 with tab_b:
     st.code(
         """
+        import tempfile
+        import uuid
         import pandas as pd
         import streamlit as st
         from databricks import sql
+        from databricks.sdk import WorkspaceClient
         from databricks.sdk.core import Config
 
         cfg = Config() # Set the DATABRICKS_HOST environment variable when running locally
@@ -93,18 +507,74 @@ with tab_b:
                 return cursor.fetchall_arrow().to_pandas()
 
 
-        def insert_overwrite_table(table_name: str, df: pd.DataFrame, conn):
-            progress = st.empty()
+        def insert_overwrite_table(table_name: str, df: pd.DataFrame, conn, batch_rows=1_000):
+            # Bind values as parameters and write in batches to stay under statement size limits
+            values = df.astype(object).where(df.notna(), None)
+            columns = ", ".join(f"`{column}`" for column in df.columns)
+            progress = st.progress(0.0, text="Calling Databricks SQL...")
             with conn.cursor() as cursor:
-                rows = list(df.itertuples(index=False))
-                values = ",".join([f"({','.join(map(repr, row))})" for row in rows])
-                with progress:
-                    st.info("Calling Databricks SQL...")
-                cursor.execute(f"INSERT OVERWRITE {table_name} VALUES {values}")
+                for start in range(0, len(df), batch_rows):
+                    rows = list(values.iloc[start : start + batch_rows].itertuples(index=False))
+                    parameters = {f"v{i}_{j}": value for i, row in enumerate(rows) for j, value in enumerate(row)}
+                    tuples = ", ".join(
+                        f"({', '.join(f':v{i}_{j}' for j in range(len(row)))})" for i, row in enumerate(rows)
+                    )
+                    mode = "OVERWRITE" if start == 0 else "INTO"
+                    cursor.execute(f"INSERT {mode} {table_name} ({columns}) VALUES {tuples}", parameters)
+                    progress.progress((start + len(rows)) / len(df))
             progress.empty()
             st.success("Changes saved")
 
 
+        def bulk_overwrite_table(table_name: str, df: pd.DataFrame, conn, volume_path: str):
+            # Stage the table as Parquet in a Volume and load it in one statement
+            staged = f"{volume_path}/_staging/{uuid.uuid4().hex}.parquet"
+            with tempfile.NamedTemporaryFile(suffix=".parquet") as local:
+                df.to_parquet(local.name, index=False, coerce_timestamps="us", allow_truncated_timestamps=True)
+                WorkspaceClient().files.upload(staged, local, overwrite=True)
+            try:
+                columns = ", ".join(f"`{column}`" for column in df.columns)
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT OVERWRITE {table_name} ({columns}) "
+                        f"SELECT {columns} FROM read_files(:path, format => 'parquet')",
+                        {"path": staged},
+                    )
+            finally:
+                WorkspaceClient().files.delete(staged)
+
+
+        def merge_changes(table_name, original_df, edited_df, keys, conn):
+            # Send only inserted, updated and deleted rows, matched on the key columns
+            columns = list(edited_df.columns)
+            before, after = original_df.set_index(keys), edited_df.set_index(keys)
+            changed = after[~after.isin(before).all(axis=1)].reset_index()[columns]
+            deleted = before.loc[before.index.difference(after.index)].reset_index()[keys]
+            rows = []
+            for frame, change in ((changed, "U"), (deleted.reindex(columns=columns), "D")):
+                frame = frame.astype(object)
+                rows += [(*row, change) for row in frame.where(frame.notna(), None).itertuples(index=False)]
+
+            parameters, tuples = {}, []
+            for i, row in enumerate(rows):
+                parameters.update({f"v{i}_{j}": value for j, value in enumerate(row)})
+                tuples.append(f"({', '.join(f':v{i}_{j}' for j in range(len(row)))})")
+            source = ", ".join(f"`{c}`" for c in columns)
+            on = " AND ".join(f"t.`{k}` = s.`{k}`" for k in keys)
+            updates = ", ".join(f"t.`{c}` = s.`{c}`" for c in columns if c not in keys)
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"MERGE INTO {table_name} AS t "
+                    f"USING (SELECT * FROM VALUES {', '.join(tuples)} AS s({source}, __change)) AS s "
+                    f"ON {on} "
+                    "WHEN MATCHED AND s.__change = 'D' THEN DELETE "
+                    f"WHEN MATCHED THEN UPDATE SET {updates} "
+                    f"WHEN NOT MATCHED AND s.__change = 'U' THEN INSERT ({source}) "
+                    f"VALUES ({', '.join(f's.`{c}`' for c in columns)})",
+                    parameters,
+                )
+
+
         http_path_input = st.text_input(
             "Specify the HTTP Path to your Databricks SQL Warehouse:",
             placeholder="/sql/1.0/warehouses/xxxxxx",
@@ -117,10 +587,12 @@ with tab_b:
         if http_path_input and table_name:
             conn = get_connection(http_path_input)
             original_df = read_table(table_name, conn)
-            edited_df = st.data_editor(original_df, num_rows="dynamic", hide_index=True)
+            edited_df = st.data_editor(
+                original_df, num_rows="dynamic", hide_index=True, key="editor"
+            )
 
-            df_diff = pd.concat([original_df, edited_df]).drop_duplicates(keep=False)
-            if not df_diff.empty:
+            # The editor records which rows were edited, added or deleted
+            if any(st.session_state["editor"].values()):
                 if st.button("Save changes"):
                     insert_overwrite_table(table_name, edited_df, conn)
         else:
@@ -136,6 +608,8 @@ with tab_c:
             """
             **Permissions (app service principal)**
             * `MODIFY` on the Unity Catalog table
+            * `READ VOLUME` and `WRITE VOLUME` on the staging Volume for bulk loading
+            * `USE CATALOG` and `USE SCHEMA` on the catalogs and schemas to browse
             * `CAN USE` on the SQL warehouse
             """
         )
@@ -144,7 +618,8 @@ with tab_c:
             """
             **Databricks resources**
             * SQL warehouse
-            * Unity Catalog table
+            * Unity Catalog table, with Change Data Feed enabled to merge concurrent edits (optional)
+            * Unity Catalog Volume for staging bulk loads (optional)
             """
         )
     with col3:
@@ -154,6 +629,7 @@ with tab_c:
             * [Databricks SDK](https://pypi.org/project/databricks-sdk/) - `databricks-sdk`
             * [Databricks SQL Connector](https://pypi.org/project/databricks-sql-connector/) - `databricks-sql-connector`
             * [Pandas](https://pypi.org/project/pandas/) - `pandas`
+            * [PyArrow](https://pypi.org/project/pyarrow/) - `pyarrow`
             * [Streamlit](https://pypi.org/project/streamlit/) - `streamlit`
             """
         )
@@ -1,6 +1,26 @@
+import os
+import tempfile
+import time
+import pandas as pd
+import pyarrow as pa
 import streamlit as st
 from databricks import sql
+from databricks.sdk import WorkspaceClient
 from databricks.sdk.core import Config
+from utils.catalog_browser import CatalogBrowser
+from utils.arrow_results import page, page_count, to_pandas
+from utils.async_query import AsyncQuery
+from utils.query_builder import (
+    OPERATORS,
+    TableQuery,
+    build_predicate,
+    quote_identifier,
+)
+from utils.result_cache import ArrowResultCache
+from utils.result_spill import ArrowSpillStore
+from utils.sql_pool import ConnectionPool
+from utils.table_metadata import TableDetail, get_table_detail, get_table_version
+from utils.table_stream import TableStream
 
 st.header(body="Tables", divider=True)
 st.subheader("Read a table")
@@ -10,9 +30,15 @@ st.write(
 
 cfg = Config()
 
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024**2
+SQL_POOL_SIZE = int(os.getenv("SQL_POOL_SIZE", "8"))
+RESULT_SPILL_DIR = os.getenv(
+    "RESULT_SPILL_DIR", os.path.join(tempfile.gettempdir(), "cookbook-results")
+)
+RESULT_SPILL_MAX_BYTES = int(os.getenv("RESULT_SPILL_MAX_MB", "4096")) * 1024**2
 
-@st.cache_resource
-def get_connection(http_path):
+
+def connect(http_path):
     return sql.connect(
         server_hostname=cfg.host,
         http_path=http_path,
@@ -20,13 +46,308 @@ def get_connection(http_path):
     )
 
 
-def read_table(table_name, conn):
-    with conn.cursor() as cursor:
-        query = f"SELECT * FROM {table_name}"
-        cursor.execute(query)
-        return cursor.fetchall_arrow().to_pandas()
+@st.cache_resource
+def get_connection_pool(http_path) -> ConnectionPool:
+    return ConnectionPool(lambda: connect(http_path), max_size=SQL_POOL_SIZE)
+
+
+@st.cache_resource
+def get_result_cache() -> ArrowResultCache:
+    return ArrowResultCache(max_bytes=RESULT_CACHE_MAX_BYTES)
+
+
+@st.cache_resource
+def get_spill_store() -> ArrowSpillStore:
+    store = ArrowSpillStore(RESULT_SPILL_DIR, max_bytes=RESULT_SPILL_MAX_BYTES)
+    store.cleanup()
+    return store
+
+
+def submit_read(query: TableQuery, http_path, arraysize=None) -> AsyncQuery:
+    # The query holds its pooled connection across script runs until it is closed
+    statement, parameters = query.to_sql()
+    pool = get_connection_pool(http_path)
+    pooled = pool.checkout()
+    return AsyncQuery.submit(
+        pooled.conn,
+        statement,
+        parameters,
+        arraysize=arraysize,
+        release=lambda discard: pool.release(pooled, discard),
+    )
+
+
+def leave_page():
+    """Cancel the pending query and close the stream when the user moves to another page."""
+    pending = st.session_state.pop("pending_read", None)
+    if pending is not None:
+        pending[1].cancel()
+    if "table_stream" in st.session_state:
+        st.session_state.pop("table_stream").close()
+        st.session_state.pop("table_stream_key", None)
+
+
+def wait_for_read(read_key, submit) -> AsyncQuery | None:
+    """Run `submit` once per `read_key` and poll it; returns None if the user cancelled."""
+    pending = st.session_state.get("pending_read")
+    if pending is not None and pending[0] != read_key:
+        # Inputs changed while the previous query was still running
+        pending[1].cancel()
+        del st.session_state.pending_read
+        pending = None
+
+    if st.session_state.get("cancelled_read") == read_key:
+        st.warning("Query cancelled.", icon="⚠️")
+        if not st.button("Run query again", icon=":material/refresh:"):
+            return None
+        del st.session_state.cancelled_read
+
+    if pending is None:
+        st.session_state.pending_read = (read_key, submit())
+    async_query = st.session_state.pending_read[1]
+
+    cancel_slot = st.empty()
+    status_slot = st.empty()
+    if cancel_slot.button("Cancel query", icon=":material/cancel:"):
+        async_query.cancel()
+        del st.session_state.pending_read
+        st.session_state.cancelled_read = read_key
+        cancel_slot.empty()
+        status_slot.warning("Query cancelled.", icon="⚠️")
+        return None
+
+    try:
+        while async_query.is_pending():
+            status_slot.info(
+                f"Query {async_query.state.lower()} for {async_query.elapsed:,.0f}s ...",
+                icon=":material/hourglass_top:",
+            )
+            time.sleep(0.5)
+    except Exception:
+        async_query.close()
+        del st.session_state.pending_read
+        raise
+    cancel_slot.empty()
+    status_slot.empty()
+    del st.session_state.pending_read
+    return async_query
+
+
+def read_table(
+    query: TableQuery, http_path, as_arrow=False, spill=False
+) -> pd.DataFrame | pa.Table | None:
+    statement, parameters = query.to_sql()
+    # Results are only reused while the Delta version is unchanged; views and other
+    # tables without history are always re-queried.
+    with get_connection_pool(http_path).connection() as conn:
+        version = get_table_version(query.table_name, conn)
+    cache_key = (http_path, query.table_name, statement, str(parameters), version)
+    cache = get_result_cache()
+
+    table = cache.get(cache_key) if version is not None else None
+    if table is None and spill and version is not None:
+        # Another session or app process may already have spilled this result
+        table = get_spill_store().get(cache_key)
+    if table is None:
+        finished = wait_for_read(cache_key, lambda: submit_read(query, http_path))
+        if finished is None:
+            return None
+        try:
+            table = finished.fetch_arrow()
+        finally:
+            finished.close()
+        if version is not None:
+            if spill:
+                # Swap the heap copy for the memory-mapped file. Mapped results sit in
+                # the page cache, so they are looked up in the spill store each time
+                # rather than counted against the in-memory cache's budget.
+                table = get_spill_store().put(cache_key, table)
+            else:
+                cache.put(cache_key, table)
+    if as_arrow:
+        return table
+    # Cached tables are shared with other sessions and must keep their buffers
+    return to_pandas(table, exclusive=version is None)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_table_schema(http_path, table_name) -> pa.Schema:
+    with get_connection_pool(http_path).connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM IDENTIFIER(:table_name) LIMIT 0",
+                {"table_name": table_name},
+            )
+            return cursor.fetchall_arrow().schema
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_cached_table_detail(http_path, table_name) -> TableDetail | None:
+    with get_connection_pool(http_path).connection() as conn:
+        return get_table_detail(table_name, conn)
+
+
+def apply_preview_sampling(
+    query: TableQuery, detail: TableDetail | None, threshold_bytes, method, max_rows
+) -> str | None:
+    """Restrict `query` to a sample if the table is above the threshold; returns a label for the sample."""
+    if detail is None or detail.size_in_bytes <= threshold_bytes:
+        return None
+
+    size = f"{detail.size_in_bytes / 1024**3:,.2f} GB, {detail.num_files:,} files"
+    if detail.estimated_rows:
+        size += f", ~{detail.estimated_rows:,} rows"
+    query.limit = min(query.limit or max_rows, max_rows)
+
+    if method == "TABLESAMPLE":
+        query.sample_percent = max(0.001, 100 * threshold_bytes / detail.size_in_bytes)
+        return (
+            f"Showing a ~{query.sample_percent:.3g}% TABLESAMPLE of this table ({size}), "
+            f"capped at {query.limit:,} rows."
+        )
+    fraction = (
+        f" (~{100 * query.limit / detail.estimated_rows:.3g}% of rows)"
+        if detail.estimated_rows
+        else ""
+    )
+    return f"Showing the first {query.limit:,} rows{fraction} of this table ({size})."
+
+
+def build_table_query(table_name, schema: pa.Schema) -> TableQuery:
+    query = TableQuery(table_name)
+    with st.expander("Query builder", icon=":material/filter_alt:"):
+        query.columns = st.multiselect(
+            "Columns (leave empty for all):", options=schema.names
+        )
+        predicates = st.data_editor(
+            pd.DataFrame(columns=["column", "operator", "value"], dtype="object"),
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "column": st.column_config.SelectboxColumn(options=schema.names),
+                "operator": st.column_config.SelectboxColumn(options=OPERATORS),
+                "value": st.column_config.TextColumn(
+                    help="Comma-separate multiple values for `in`."
+                ),
+            },
+        )
+        for row in predicates.itertuples(index=False):
+            if not row.column or not row.operator:
+                continue
+            try:
+                query.predicates.append(
+                    build_predicate(row.column, row.operator, row.value or "", schema)
+                )
+            except ValueError as e:
+                st.error(f"Invalid filter on `{row.column}`: {e}", icon="🚨")
+
+        col_order, col_desc, col_limit = st.columns([3, 1, 2])
+        with col_order:
+            query.order_by = st.selectbox(
+                "Order by:",
+                options=[None, *schema.names],
+                format_func=lambda c: c or "—",
+            )
+        with col_desc:
+            query.descending = st.checkbox("Descending", disabled=not query.order_by)
+        with col_limit:
+            query.limit = st.number_input(
+                "Row limit (0 for none):", min_value=0, value=0, step=1_000
+            )
+
+        statement, parameters = query.to_sql(schema)
+        st.code(statement, language="sql")
+        st.caption(f"Parameters: {parameters}")
+    return query
 
 
+def get_table_stream(
+    http_path, query: TableQuery, page_size, max_mb
+) -> TableStream | None:
+    statement, parameters = query.to_sql()
+    stream_key = (http_path, statement, str(parameters), page_size, max_mb)
+    if st.session_state.get("table_stream_key") != stream_key:
+        if "table_stream" in st.session_state:
+            st.session_state.pop("table_stream").close()
+            st.session_state.pop("table_stream_key")
+        finished = wait_for_read(
+            ("stream", *stream_key),
+            lambda: submit_read(query, http_path, arraysize=page_size),
+        )
+        if finished is None:
+            return None
+        try:
+            finished.finish()
+        except Exception:
+            finished.close()
+            raise
+        # The stream takes over the query's cursor and releases its connection
+        st.session_state.table_stream = TableStream(
+            finished.cursor,
+            page_size=page_size,
+            max_bytes=max_mb * 1024**2,
+            on_close=finished.close,
+        )
+        st.session_state.table_stream_key = stream_key
+        st.session_state.table_stream_page = 0
+    return st.session_state.table_stream
+
+
+def change_stream_page(step):
+    st.session_state.table_stream_page = max(
+        0, st.session_state.table_stream_page + step
+    )
+
+
+@st.cache_resource
+def get_catalog_browser() -> CatalogBrowser:
+    return CatalogBrowser(WorkspaceClient())
+
+
+def select_table(browser: CatalogBrowser) -> str | None:
+    col_catalog, col_schema, col_table, col_refresh = st.columns([4, 4, 4, 1])
+    try:
+        with col_catalog:
+            catalog = st.selectbox(
+                "Catalog:", browser.catalogs(), index=None, placeholder="Select"
+            )
+        with col_schema:
+            schema = st.selectbox(
+                "Schema:",
+                browser.schemas(catalog) if catalog else [],
+                index=None,
+                placeholder="Select",
+                disabled=not catalog,
+            )
+        with col_table:
+            table = st.selectbox(
+                "Table:",
+                browser.tables(catalog, schema) if schema else [],
+                index=None,
+                placeholder="Select",
+                disabled=not schema,
+            )
+    except Exception as e:
+        st.error(f"Error listing Unity Catalog objects: {e}", icon="🚨")
+        return None
+    with col_refresh:
+        st.button(
+            "",
+            icon=":material/refresh:",
+            help="Reload the catalog listings",
+            on_click=browser.refresh,
+            args=(catalog,),
+        )
+    if catalog and schema and table:
+        return ".".join(quote_identifier(part) for part in (catalog, schema, table))
+    return None
+
+
+# A pending query or open stream holds a pooled connection; give it back on leaving
+on_leave = st.session_state.setdefault("on_leave", {})
+on_leave[st.session_state.get("current_page")] = leave_page
+
 tab_a, tab_b, tab_c = st.tabs(["**Try it**", "**Code snippet**", "**Requirements**"])
 
 with tab_a:
@@ -34,14 +355,155 @@ with tab_a:
         "Enter your Databricks HTTP Path:", placeholder="/sql/1.0/warehouses/xxxxxx"
     )
 
-    table_name = st.text_input(
-        "Specify a Unity Catalog table name:", placeholder="catalog.schema.table"
+    table_source = st.radio(
+        "Choose a table:", ["Browse Unity Catalog", "Enter a name"], horizontal=True
+    )
+    if table_source == "Browse Unity Catalog":
+        table_name = select_table(get_catalog_browser())
+    else:
+        table_name = st.text_input(
+            "Specify a Unity Catalog table name:", placeholder="catalog.schema.table"
+        )
+
+    stream_results = st.toggle(
+        "Stream results page by page",
+        help="Show the first page as soon as it arrives and fetch further pages on demand.",
+    )
+    if stream_results:
+        col_page_size, col_max_mb = st.columns(2)
+        with col_page_size:
+            page_size = st.number_input(
+                "Rows per page:", min_value=100, value=10_000, step=1_000
+            )
+        with col_max_mb:
+            max_mb = st.number_input(
+                "Memory ceiling (MB):", min_value=16, value=256, step=16
+            )
+
+    else:
+        keep_arrow = st.toggle(
+            "Keep results in Arrow",
+            help="Skip the pandas conversion and render zero-copy slices of the Arrow result.",
+        )
+        spill_results = st.toggle(
+            "Share results through memory-mapped files",
+            help="Spill results to Arrow IPC files on local disk so all sessions and app processes map one copy.",
+        )
+
+    preview_sample = st.toggle(
+        "Preview large tables as a sample",
+        help="Read table size from DESCRIBE DETAIL first and only fetch a sample of tables above the threshold.",
     )
+    if preview_sample:
+        col_threshold, col_method, col_max_rows = st.columns(3)
+        with col_threshold:
+            threshold_mb = st.number_input(
+                "Sample tables larger than (MB):", min_value=1, value=1024, step=256
+            )
+        with col_method:
+            sample_method = st.selectbox("Sampling method:", ["TABLESAMPLE", "LIMIT"])
+        with col_max_rows:
+            sample_max_rows = st.number_input(
+                "Maximum sample rows:", min_value=100, value=100_000, step=10_000
+            )
 
     if http_path_input and table_name:
-        conn = get_connection(http_path_input)
-        df = read_table(table_name, conn)
-        st.dataframe(df)
+        schema = get_table_schema(http_path_input, table_name)
+        query = build_table_query(table_name, schema)
+
+        if preview_sample:
+            sample_label = apply_preview_sampling(
+                query,
+                get_cached_table_detail(http_path_input, table_name),
+                threshold_mb * 1024**2,
+                sample_method,
+                sample_max_rows,
+            )
+            if sample_label:
+                st.info(sample_label, icon=":material/percent:")
+
+        if stream_results:
+            stream = get_table_stream(http_path_input, query, page_size, max_mb)
+            if stream is not None:
+                page_number = st.session_state.table_stream_page
+                stream_page = stream.page(page_number)
+
+                if stream_page is not None:
+                    st.dataframe(stream_page)
+                elif stream.is_evicted(page_number):
+                    st.warning(
+                        "This page was evicted to stay under the memory ceiling. Reload the table to view it again."
+                    )
+                else:
+                    st.info("No more rows.")
+
+                col_prev, col_next, col_status = st.columns([1, 1, 4])
+                with col_prev:
+                    st.button(
+                        "Previous",
+                        on_click=change_stream_page,
+                        args=(-1,),
+                        disabled=page_number == 0,
+                    )
+                with col_next:
+                    st.button(
+                        "Next",
+                        on_click=change_stream_page,
+                        args=(1,),
+                        disabled=stream.exhausted
+                        and page_number >= stream.pages_fetched - 1,
+                    )
+                with col_status:
+                    st.caption(
+                        f"Page {page_number + 1} · {stream.rows_fetched:,} rows fetched"
+                        f"{' (complete)' if stream.exhausted else ''} · "
+                        f"{stream.held_bytes / 1024**2:,.1f} MB held"
+                    )
+        else:
+            result = read_table(
+                query, http_path_input, as_arrow=keep_arrow, spill=spill_results
+            )
+            if result is not None:
+                if keep_arrow:
+                    col_rows, col_page = st.columns(2)
+                    with col_rows:
+                        display_rows = st.number_input(
+                            "Rows to display:", min_value=100, value=10_000, step=1_000
+                        )
+                    with col_page:
+                        pages = page_count(result, display_rows)
+                        display_page = st.number_input(
+                            "Page:",
+                            min_value=1,
+                            max_value=pages,
+                            help=f"{pages:,} pages",
+                        )
+                    st.dataframe(page(result, display_page - 1, display_rows))
+                    st.caption(
+                        f"{result.num_rows:,} rows · {result.nbytes / 1024**2:,.1f} MB in Arrow"
+                    )
+                else:
+                    st.dataframe(result)
+
+                stats = get_result_cache().stats()
+                st.caption(
+                    f"Result cache: {stats.hits:,} hits · {stats.misses:,} misses · "
+                    f"{stats.entries} entries · {stats.bytes_held / 1024**2:,.1f} of "
+                    f"{stats.max_bytes / 1024**2:,.0f} MB held"
+                )
+                if spill_results:
+                    spill_stats = get_spill_store().stats()
+                    st.caption(
+                        f"Spilled results: {spill_stats.files} files · "
+                        f"{spill_stats.bytes_on_disk / 1024**2:,.1f} of "
+                        f"{spill_stats.max_bytes / 1024**2:,.0f} MB on disk"
+                    )
+                pool_stats = get_connection_pool(http_path_input).stats()
+                st.caption(
+                    f"Connection pool: {pool_stats.in_use} in use · {pool_stats.idle} idle · "
+                    f"{pool_stats.max_size} max · {pool_stats.created} opened · "
+                    f"{pool_stats.reconnects} reconnects · {pool_stats.waits} waits"
+                )
 
 with tab_b:
     st.code(
@@ -70,6 +532,31 @@ with tab_b:
                 return cursor.fetchall_arrow().to_pandas()
 
 
+        def read_table_pages(table_name, conn, page_size=10_000):
+            # Yield Arrow record batches as they arrive instead of waiting for the full result
+            with conn.cursor(arraysize=page_size) as cursor:
+                cursor.execute(f"SELECT * FROM {table_name}")
+                while True:
+                    page = cursor.fetchmany_arrow(page_size)
+                    if page.num_rows == 0:
+                        break
+                    yield page
+                    if page.num_rows < page_size:
+                        break
+
+
+        def read_table_filtered(table_name, columns, conn, min_amount, row_limit=1_000):
+            # Let the warehouse do the projection, filtering and limiting
+            projection = ", ".join(f"`{column}`" for column in columns)
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {projection} FROM IDENTIFIER(:table_name) "
+                    "WHERE amount > :min_amount LIMIT :row_limit",
+                    {"table_name": table_name, "min_amount": min_amount, "row_limit": row_limit},
+                )
+                return cursor.fetchall_arrow().to_pandas()
+
+
         http_path_input = st.text_input(
             "Enter your Databricks HTTP Path:", placeholder="/sql/1.0/warehouses/xxxxxx"
         )
@@ -92,6 +579,7 @@ with tab_c:
         st.markdown("""
                     **Permissions (app service principal)**
                     * `SELECT` on the Unity Catalog table
+                    * `USE CATALOG` and `USE SCHEMA` on the catalogs and schemas to browse
                     * `CAN USE` on the SQL warehouse
                     """)
     with col2:
@@ -105,5 +593,6 @@ with tab_c:
                     **Dependencies**
                     * [Databricks SDK](https://pypi.org/project/databricks-sdk/) - `databricks-sdk`
                     * [Databricks SQL Connector](https://pypi.org/project/databricks-sql-connector/) - `databricks-sql-connector`
+                    * [PyArrow](https://pypi.org/project/pyarrow/) - `pyarrow`
                     * [Streamlit](https://pypi.org/project/streamlit/) - `streamlit`
                     """)
@@ -1,18 +1,83 @@
 import os
 import streamlit as st
 from databricks.sdk import WorkspaceClient
+from utils.download_streams import (
+    DONE,
+    FAILED,
+    PENDING,
+    DownloadLink,
+    DownloadStreams,
+)
+from utils.volume_preview import preview_file
 
 w = WorkspaceClient()
 
+DOWNLOAD_LINK_TTL = float(os.getenv("DOWNLOAD_LINK_TTL", "600"))
+MAX_DOWNLOADS = int(os.getenv("MAX_DOWNLOADS", "8"))
+MAX_IN_MEMORY_DOWNLOAD_MB = float(os.getenv("MAX_IN_MEMORY_DOWNLOAD_MB", "100"))
+PREVIEW_ROWS = int(os.getenv("PREVIEW_ROWS", "100"))
+
 st.header(body="Volumes", divider=True)
 st.subheader("Download a file")
 
 st.write(
-    "This recipe downloads a file from a [Unity Catalog volume](https://docs.databricks.com/en/volumes/index.html)."
+    "This recipe downloads a file from a [Unity Catalog volume](https://docs.databricks.com/en/volumes/index.html), or previews its first rows without downloading it."
 )
 
 tab1, tab2, tab3 = st.tabs(["**Try it**", "**Code snippet**", "**Requirements**"])
 
+
+@st.cache_resource
+def get_download_streams() -> DownloadStreams | None:
+    streams = DownloadStreams(
+        w.files, ttl=DOWNLOAD_LINK_TTL, max_downloads=MAX_DOWNLOADS
+    )
+    # Files stream from the Volume to the browser without passing through memory whole.
+    # The route is added to Streamlit's Tornado server, which is not a public API, so
+    # if a Streamlit upgrade changes it, downloads fall back to st.download_button.
+    try:
+        streams.install()
+    except RuntimeError:
+        return None
+    return streams
+
+
+def show_in_memory_download(path: str):
+    # st.download_button needs the whole file in memory, so only smaller files can use it
+    size = w.files.get_metadata(path).content_length
+    if size is not None and size > MAX_IN_MEMORY_DOWNLOAD_MB * 1024**2:
+        raise ValueError(
+            f"Download links are not available on this server, and the file is larger "
+            f"than the {MAX_IN_MEMORY_DOWNLOAD_MB:,.0f} MB that can be downloaded "
+            f"without them."
+        )
+    file_data = w.files.download(path).contents.read()
+    file_name = os.path.basename(path)
+    st.success(f"File '{file_name}' downloaded successfully", icon="✅")
+    st.download_button(
+        label="Download file",
+        data=file_data,
+        file_name=file_name,
+        mime="application/octet-stream",
+    )
+
+
+def show_download_progress(link: DownloadLink, polling: bool):
+    # Stop polling once the download ends or the link expires without being opened
+    finished = link.state in (DONE, FAILED)
+    if polling and (finished or get_download_streams().get(link.token) is None):
+        st.rerun(scope="app")
+    if link.state == FAILED:
+        st.error(f"Error downloading file: {link.error}", icon="🚨")
+    elif link.state == DONE:
+        st.success(f"File '{link.file_name}' downloaded successfully", icon="✅")
+    elif link.sent:
+        fraction = min(link.sent / link.size, 1.0) if link.size else 0.0
+        st.progress(
+            fraction, text=f"Sent {link.sent / 1024**2:,.1f} MB of '{link.file_name}'"
+        )
+
+
 with tab1:
     download_file_path = st.text_input(
         label="Specify a path to a file in a Unity Catalog volume:",
@@ -21,41 +86,126 @@ with tab1:
 
     if st.button("Get file"):
         if download_file_path:
+            streams = get_download_streams()
             try:
-                resp = w.files.download(download_file_path)
-                file_data = resp.contents.read()
-
-                file_name = os.path.basename(download_file_path)
+                if streams is not None:
+                    st.session_state["download_link"] = streams.create(
+                        download_file_path
+                    )
+                else:
+                    show_in_memory_download(download_file_path)
+            except Exception as e:
+                st.session_state.pop("download_link", None)
+                st.error(f"Error downloading file: {str(e)}")
+        else:
+            st.warning("Please specify a file path.")
 
-                st.success(f"File '{file_name}' downloaded successfully", icon="✅")
-                st.download_button(
-                    label="Download file",
-                    data=file_data,
-                    file_name=file_name,
-                    mime="application/octet-stream",
+    if st.button("Preview file"):
+        if download_file_path:
+            try:
+                # Only the bytes the first rows need are read, even from large files
+                st.session_state["preview"] = (
+                    download_file_path,
+                    preview_file(w, download_file_path, rows=PREVIEW_ROWS),
                 )
             except Exception as e:
-                st.error(f"Error downloading file: {str(e)}")
+                st.session_state.pop("preview", None)
+                st.error(f"Error previewing file: {str(e)}", icon="🚨")
         else:
             st.warning("Please specify a file path.")
 
+    preview_path, preview = st.session_state.get("preview", (None, None))
+    if preview is not None and preview_path == download_file_path:
+        st.dataframe(preview.data, hide_index=True)
+        st.caption(
+            f"{preview.format.upper()} preview: read {preview.bytes_fetched / 1024:,.0f} KB "
+            f"of {preview.size / 1024**2:,.1f} MB in {preview.requests} requests."
+            + (f" {preview.note}." if preview.note else "")
+        )
+
+    link = st.session_state.get("download_link")
+    if link is not None and get_download_streams().get(link.token) is None:
+        del st.session_state["download_link"]
+        if link.state == PENDING:
+            st.warning(
+                "The download link expired before it was opened. Get the file again.",
+                icon="⚠️",
+            )
+        link = None
+    if link is not None and link.path == download_file_path:
+        size = f" ({link.size / 1024**2:,.1f} MB)" if link.size is not None else ""
+        st.link_button(
+            f"Download {link.file_name}{size}",
+            get_download_streams().url(link, st.get_option("server.baseUrlPath")),
+        )
+        polling = link.state not in (DONE, FAILED)
+        st.fragment(show_download_progress, run_every=1 if polling else None)(
+            link, polling
+        )
+
 with tab2:
     st.code("""
+    import gc
+    import io
     import os
+    import secrets
+    import pandas as pd
     import streamlit as st
+    import tornado.web
     from databricks.sdk import WorkspaceClient
+    from tornado.ioloop import IOLoop
 
     w = WorkspaceClient()
 
+
+    class DownloadHandler(tornado.web.RequestHandler):
+        async def get(self, token):
+            path = get_links().get(token)
+            if path is None:
+                raise tornado.web.HTTPError(404)
+            loop = IOLoop.current()
+            response = await loop.run_in_executor(None, w.files.download, path)
+            file_name = os.path.basename(path)
+            self.set_header("Content-Disposition", f'attachment; filename="{file_name}"')
+            # Relay one block at a time instead of reading the whole file into memory
+            while chunk := await loop.run_in_executor(
+                None, response.contents.read, 1024 * 1024
+            ):
+                self.write(chunk)
+                await self.flush()
+
+
+    @st.cache_resource
+    def get_links():
+        # Streamlit has no API for extra routes, so add one to its Tornado application.
+        # This relies on Streamlit internals and may stop working after an upgrade.
+        apps = [app for app in gc.get_objects() if isinstance(app, tornado.web.Application)]
+        if not apps:
+            raise RuntimeError("No Tornado application found to add the route to")
+        for app in apps:
+            app.add_handlers(".*", [(r"/volume-downloads/([\\w-]+)", DownloadHandler)])
+        return {}
+
+
     download_file_path = st.text_input(
         label="Path to file", placeholder="/Volumes/catalog/schema/volume_name/file.csv"
     )
 
-    response = w.files.download(download_file_path)
-    file_data = response.contents.read()
-    file_name = os.path.basename(download_file_path)
-
-    st.download_button(label="Download", data=file_data, file_name=file_name)
+    if st.button("Get file"):
+        token = secrets.token_urlsafe(32)
+        get_links()[token] = download_file_path
+        st.link_button("Download", f"/volume-downloads/{token}")
+
+    if st.button("Preview CSV"):
+        # Fetch only the first megabyte instead of the whole file
+        response = w.api_client.do(
+            "GET",
+            f"/api/2.0/fs/files{download_file_path}",
+            headers={"Range": "bytes=0-1048575"},
+            raw=True,
+        )
+        head = response["contents"].read()
+        st.dataframe(pd.read_csv(io.BytesIO(head[: head.rfind(b"\\n") + 1]), nrows=100))
     """)
 
 with tab3:
@@ -80,5 +230,12 @@ with tab3:
         st.markdown("""
                     **Dependencies**
                     * [Databricks SDK for Python](https://pypi.org/project/databricks-sdk/) - `databricks-sdk`
+                    * [Pandas](https://pypi.org/project/pandas/) - `pandas`
+                    * [PyArrow](https://pypi.org/project/pyarrow/) - `pyarrow`
                     * [Streamlit](https://pypi.org/project/streamlit/) - `streamlit`
+
+                    Download links add a route to the Tornado server inside Streamlit,
+                    which is not part of Streamlit's API. Pin the `streamlit` version
+                    and check downloads after upgrading it. Without the route, files up
+                    to `MAX_IN_MEMORY_DOWNLOAD_MB` download through `st.download_button`.
                     """)
@@ -1,12 +1,41 @@
 import os
-import io
+import json
+import posixpath
+import tempfile
+import zipfile
+from contextlib import ExitStack
+from itertools import chain
+import pandas as pd
 import streamlit as st
 from databricks.sdk import WorkspaceClient
-from databricks.sdk.service.catalog import SecurableType
+from utils.batch_upload import (
+    FAILED,
+    SKIPPED,
+    UPLOADED,
+    file_items,
+    upload_batch,
+    zip_items,
+)
+from utils.multipart_upload import FilesMultipartAPI, MultipartUploader
+from utils.upload_checkpoints import CheckpointStore
+from utils.upload_dedup import DedupUploader, UploadIndex
+from utils.volume_permissions import VolumePermissions
 
 databricks_host = os.getenv("DATABRICKS_HOST") or os.getenv("DATABRICKS_HOSTNAME")
 w = WorkspaceClient()
 
+UPLOAD_PART_MB = int(os.getenv("UPLOAD_PART_MB", "64"))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "8"))
+BATCH_UPLOAD_CONCURRENCY = int(os.getenv("BATCH_UPLOAD_CONCURRENCY", "16"))
+PERMISSION_CACHE_TTL = float(os.getenv("PERMISSION_CACHE_TTL", "60"))
+UPLOAD_INDEX_PATH = os.getenv(
+    "UPLOAD_INDEX_PATH", os.path.join(tempfile.gettempdir(), "volume-upload-index.json")
+)
+UPLOAD_CHECKPOINT_DIR = os.getenv(
+    "UPLOAD_CHECKPOINT_DIR",
+    os.path.join(tempfile.gettempdir(), "volume-upload-checkpoints"),
+)
+
 st.header(body="Volumes", divider=True)
 st.subheader("Upload a file")
 
@@ -17,27 +46,95 @@ st.write(
 tab1, tab2, tab3 = st.tabs(["**Try it**", "**Code snippet**", "**Requirements**"])
 
 
+@st.cache_resource
+def get_uploader() -> DedupUploader:
+    uploader = MultipartUploader(
+        FilesMultipartAPI(w, connections=UPLOAD_CONCURRENCY),
+        w.files.upload,
+        part_size=UPLOAD_PART_MB * 1024**2,
+        concurrency=UPLOAD_CONCURRENCY,
+        # An interrupted upload of a large file resumes from its last confirmed part
+        checkpoints=CheckpointStore(UPLOAD_CHECKPOINT_DIR),
+    )
+    # Files whose content the Volume already holds are not sent again
+    return DedupUploader(uploader, w.files, UploadIndex(UPLOAD_INDEX_PATH))
+
+
+@st.cache_resource
+def get_volume_permissions() -> VolumePermissions:
+    return VolumePermissions(w, ttl=PERMISSION_CACHE_TTL)
+
+
 def check_upload_permissions(volume_name: str):
     try:
-        volume = w.volumes.read(name=volume_name)
-        current_user = w.current_user.me()
-        grants = w.grants.get_effective(
-            securable_type=SecurableType.VOLUME,
-            full_name=volume.full_name,
-            principal=current_user.user_name,
+        return get_volume_permissions().check_write(volume_name).message
+    except Exception as e:
+        return f"Error: {e}"
+
+
+def upload_files(uploaded_files: list, volume_name: str):
+    catalog, schema, volume = volume_name.split(".")
+    volume_path = f"/Volumes/{catalog}/{schema}/{volume}"
+    archives = [f for f in uploaded_files if f.name.lower().endswith(".zip")]
+    files = [f for f in uploaded_files if f not in archives]
+
+    with ExitStack() as stack:
+        # Each archive is expanded into a folder named after it, member by member
+        opened = [(stack.enter_context(zipfile.ZipFile(f)), f.name) for f in archives]
+        # Listing items reads no file contents, and counts only what will be uploaded
+        items = list(
+            chain(
+                file_items(files),
+                *(zip_items(z, posixpath.splitext(name)[0]) for z, name in opened),
+            )
         )
+        total_files = len(items)
+        total_bytes = sum(item.size for item in items)
 
-        if not grants or not grants.privilege_assignments:
-            return "Insufficient permissions: No grants found."
+        progress = st.progress(0.0, text=f"Uploading {total_files:,} files...")
+        status = st.empty()
 
-        for assignment in grants.privilege_assignments:
-            for privilege in assignment.privileges:
-                if privilege.privilege.value in ["ALL_PRIVILEGES", "WRITE_VOLUME"]:
-                    return "Volume and permissions validated"
+        def show(result):
+            done = sum(u.state in (UPLOADED, SKIPPED, FAILED) for u in result.uploads)
+            progress.progress(
+                min(result.bytes_done / total_bytes, 1.0) if total_bytes else 1.0,
+                text=f"Uploaded {done:,} of {total_files:,} files "
+                f"at {result.throughput() / 1024**2:,.1f} MB/s",
+            )
+            status.dataframe(
+                pd.DataFrame(
+                    [vars(u) for u in result.uploads],
+                    columns=["name", "size", "state", "sent", "seconds", "error"],
+                ),
+                hide_index=True,
+            )
 
-        return "Insufficient permissions: Required privileges not found."
-    except Exception as e:
-        return f"Error: {e}"
+        result = upload_batch(
+            get_uploader(),
+            volume_path,
+            items,
+            concurrency=BATCH_UPLOAD_CONCURRENCY,
+            on_update=show,
+        )
+
+    uploaded = len(result.uploads) - len(result.failed) - len(result.skipped)
+    summary = (
+        f"Uploaded {uploaded:,} files "
+        f"({result.bytes_sent / 1024**2:,.1f} MB) in {result.seconds:,.1f} s"
+    )
+    if result.skipped:
+        summary += f", skipped {len(result.skipped):,} unchanged"
+    if result.failed:
+        st.warning(f"{summary}; {len(result.failed):,} failed.", icon="⚠️")
+    else:
+        st.success(f"{summary}.", icon="✅")
+    st.download_button(
+        "Download manifest",
+        json.dumps(result.manifest(volume_path), indent=2),
+        file_name="upload-manifest.json",
+        mime="application/json",
+        icon=":material/download:",
+    )
 
 
 if "volume_check_success" not in st.session_state:
@@ -58,7 +155,32 @@ with tab1:
             st.session_state.volume_check_success = False
             st.error(permission_result, icon="🚨")
 
-    if st.session_state.volume_check_success:
+    batch_mode = st.session_state.volume_check_success and st.toggle(
+        "Upload several files or zip archives",
+        help="Files are uploaded in parallel; zip archives are expanded "
+        "into a folder named after them.",
+    )
+
+    if batch_mode:
+        uploaded_files = st.file_uploader(
+            label="Pick files or zip archives to upload", accept_multiple_files=True
+        )
+
+        if st.button(
+            f"Upload files to {upload_volume_path}",
+            icon=":material/drive_folder_upload:",
+        ):
+            if len(upload_volume_path.strip().split(".")) != 3:
+                st.warning("Please specify a valid Volume path.", icon="⚠️")
+            elif not uploaded_files:
+                st.warning("Please pick files to upload.", icon="⚠️")
+            else:
+                try:
+                    upload_files(uploaded_files, upload_volume_path.strip())
+                except Exception as e:
+                    st.error(f"Error uploading files: {e}", icon="🚨")
+
+    elif st.session_state.volume_check_success:
         uploaded_file = st.file_uploader(label="Pick a file to upload")
 
         if st.button(
@@ -70,8 +192,6 @@ with tab1:
                 st.warning("Please pick a file to upload.", icon="⚠️")
             else:
                 try:
-                    file_bytes = uploaded_file.read()
-                    binary_data = io.BytesIO(file_bytes)
                     file_name = uploaded_file.name
                     parts = upload_volume_path.strip().split(".")
                     catalog = parts[0]
@@ -80,12 +200,31 @@ with tab1:
                     volume_file_path = (
                         f"/Volumes/{catalog}/{schema}/{volume_name}/{file_name}"
                     )
-                    w.files.upload(volume_file_path, binary_data, overwrite=True)
-                    volume_url = f"https://{databricks_host}/explore/data/volumes/{catalog}/{schema}/{volume_name}"
-                    st.success(
-                        f"File '{file_name}' successfully uploaded to **{upload_volume_path}**. [Go to volume]({volume_url}).",
-                        icon="✅",
+                    progress = st.progress(0.0, text=f"Uploading {file_name}...")
+
+                    def report(sent, total):
+                        progress.progress(
+                            sent / total if total else 1.0,
+                            text=f"Uploaded {sent / 1024**2:,.1f} of {total / 1024**2:,.1f} MB",
+                        )
+
+                    # Large files go up in parallel parts, small ones in one stream
+                    uploaded_file.seek(0)
+                    parts = get_uploader().upload(
+                        volume_file_path, uploaded_file, on_progress=report
                     )
+                    progress.empty()
+                    volume_url = f"https://{databricks_host}/explore/data/volumes/{catalog}/{schema}/{volume_name}"
+                    if parts:
+                        st.success(
+                            f"File '{file_name}' successfully uploaded to **{upload_volume_path}**. [Go to volume]({volume_url}).",
+                            icon="✅",
+                        )
+                    else:
+                        st.success(
+                            f"File '{file_name}' is already up to date in **{upload_volume_path}**, so it was not uploaded again. [Go to volume]({volume_url}).",
+                            icon="✅",
+                        )
                 except Exception as e:
                     st.error(f"Error uploading file: {e}", icon="🚨")
 
@@ -95,6 +234,36 @@ with tab2:
     import streamlit as st
     from databricks.sdk import WorkspaceClient
 
+
+    # Streams `f` into the request body block by block, reporting progress
+    class ProgressReader(io.RawIOBase):
+        def __init__(self, f, on_progress):
+            self._f = f
+            self._size = f.seek(0, io.SEEK_END)
+            f.seek(0)
+            self._on_progress = on_progress
+
+        def __len__(self):
+            return self._size
+
+        def readable(self):
+            return True
+
+        def seekable(self):
+            return True
+
+        def tell(self):
+            return self._f.tell()
+
+        def seek(self, offset, whence=io.SEEK_SET):
+            return self._f.seek(offset, whence)
+
+        def read(self, size=-1):
+            data = self._f.read(size)
+            self._on_progress(self._f.tell(), self._size)
+            return data
+
+
     w = WorkspaceClient()
 
     uploaded_file = st.file_uploader(label="Select file")
@@ -105,15 +274,18 @@ with tab2:
     )
 
     if st.button("Save changes"):
-        file_bytes = uploaded_file.read()
-        binary_data = io.BytesIO(file_bytes)
         file_name = uploaded_file.name
         parts = upload_volume_path.strip().split(".")
         catalog = parts[0]
         schema = parts[1]
         volume_name = parts[2]
         volume_file_path = f"/Volumes/{catalog}/{schema}/{volume_name}/{file_name}"
-        w.files.upload(volume_file_path, binary_data, overwrite=True)
+        progress = st.progress(0.0)
+        reader = ProgressReader(
+            uploaded_file,
+            lambda sent, total: progress.progress(sent / total if total else 1.0),
+        )
+        w.files.upload(volume_file_path, reader, overwrite=True)
 
     """)
 